@@ -1,8 +1,12 @@
+import logging
+
 from django.apps import AppConfig
-from django.core.management import call_command
-from django.db.models.signals import post_migrate
+from django.conf import settings
+from django.db.models.signals import post_migrate, post_save
 from django.utils.translation import gettext_lazy as _
 
+logger = logging.getLogger(__name__)
+
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -10,10 +14,20 @@ class AccountsConfig(AppConfig):
     verbose_name = _('Compte Utilisateur')
 
     def ready(self):
-        from .spectacular_extensions import JWTAndCookieAuthenticationScheme
-        setattr(self, 'scheme', JWTAndCookieAuthenticationScheme)
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        from .blacklist import revoke_blacklisted_token
+
+        post_save.connect(
+            revoke_blacklisted_token, sender=BlacklistedToken, dispatch_uid='accounts.revoke_blacklisted_token',
+        )
+        # The OpenAPI extensions are registered by config.generators.SchemaGenerator, only when a schema is generated
+        if settings.DEBUG:
+            post_migrate.connect(self.create_default_admin, sender=self)
 
-        post_migrate.connect(self.create_default_admin, sender=self)
+    def create_default_admin(self, using=None, **kwargs):
+        from .maintenance import create_default_admin
 
-    def create_default_admin(self, *args, **kwargs):
-        call_command('create_default_admin')
+        # The test runner turns DEBUG off after the apps are ready
+        if settings.DEBUG and create_default_admin(using):
+            logger.info('Admin user created successfully')
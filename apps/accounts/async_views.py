@@ -0,0 +1,246 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from utils.conditional import conditional_response, set_validators
+
+from .authentication import JWTAndCookieAuthentication
+from .hashing import password_hashing
+from .login_guard import get_login_attempt, login_guard
+from .models import User
+from .serializers import PasswordResetSerializer, UserSerializer, UserTokenBlacklistSerializer, \
+    UserTokenRefreshSerializer, WithUserTokenObtainPairSerializer
+from .throttles import PasswordResetIPThrottle, PasswordResetRateThrottle
+from .tokens import RefreshToken
+from .views import delete_token_cookies, set_token_cookies, user_etag
+
+
+async def aauthenticate_credentials(email, password):
+    """
+    ``ModelBackend.authenticate`` with the password hashing moved off the event loop onto the hashing pool.
+    """
+    try:
+        user = await User.objects.aget_by_natural_key(email)
+    except User.DoesNotExist:
+        # Run the default password hasher once to reduce the timing difference between an existing
+        # and a nonexistent user, like ModelBackend does
+        await password_hashing.arun(make_password, password)
+        return None
+
+    is_correct, must_update = await password_hashing.arun(verify_password, password, user.password)
+    if not is_correct:
+        return None
+
+    if must_update:
+        user.password = await password_hashing.arun(make_password, password)
+        await user.asave(update_fields=['password'])
+
+    return user if user.is_active else None
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of DRF's ``APIView`` for the auth endpoints.
+
+    Bodies go through the configured JSON parser, responses through the configured renderer and errors
+    through the configured exception handler, so payloads and error envelopes match the sync views.
+    """
+    authentication_classes = (JWTAndCookieAuthentication,)
+    authentication_required = False
+    throttle_classes = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_parser(self):
+        return next(
+            parser_class() for parser_class in api_settings.DEFAULT_PARSER_CLASSES
+            if parser_class.media_type == 'application/json'
+        )
+
+    def get_renderer(self):
+        return api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    def get_data(self, request):
+        if not request.body:
+            return {}
+        return self.get_parser().parse(request, 'application/json', {'request': request, 'view': self})
+
+    async def initial(self, request):
+        request.user, request.auth = AnonymousUser(), None
+        for authentication_class in self.authentication_classes:
+            result = await authentication_class().aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                break
+
+        if self.authentication_required and not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                raise exceptions.Throttled(throttle.wait())
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.data = self.get_data(request)
+            await self.initial(request)
+
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(request, response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, TokenError):
+            exc = InvalidToken(exc.args[0])
+
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Like simplejwt's token views, answer with the JWT challenge even without authenticators
+            exc.auth_header = JWTAndCookieAuthentication().authenticate_header(self.request)
+
+        context = {'view': self, 'args': self.args, 'kwargs': self.kwargs, 'request': self.request}
+        response = api_settings.EXCEPTION_HANDLER(exc, context)
+        if response is None:
+            raise exc
+        return response
+
+    def finalize_response(self, request, response):
+        if not isinstance(response, Response):
+            # Already rendered, e.g. by View.options
+            return response
+
+        renderer = self.get_renderer()
+        content = renderer.render(response.data, renderer.media_type, {'view': self, 'request': request})
+        http_response = HttpResponse(content, status=response.status_code, content_type=renderer.media_type)
+        for header, value in response.headers.items():
+            if header.lower() != 'content-type':
+                http_response[header] = value
+        http_response.cookies = response.cookies
+        return http_response
+
+
+class UserTokensInCookieMixin:
+
+    def get_data(self, request):
+        data = super().get_data(request)
+        refresh_token = request.COOKIES.get('refresh_token', None)
+        if refresh_token is not None:
+            data = {'refresh': refresh_token, **data}
+        return data
+
+
+class AsyncAccountView(AsyncAPIView):
+    authentication_required = True
+
+    async def get(self, request, *args, **kwargs):
+        etag = user_etag(request.user, self.get_renderer().format)
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return set_validators(Response(status=not_modified.status_code), etag)
+        return set_validators(Response(UserSerializer(request.user).data), etag)
+
+
+class AsyncTokenObtainPairView(AsyncAPIView):
+    authentication_classes = ()
+
+    async def post(self, request, *args, **kwargs):
+        serializer = WithUserTokenObtainPairSerializer()
+        email, ip = get_login_attempt(request, serializer.username_field)
+        await login_guard.acheck(email, ip)
+        attrs = serializer.to_internal_value(request.data)
+
+        user = await aauthenticate_credentials(attrs[serializer.username_field], attrs['password'])
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            await login_guard.afailed(email, ip)
+            raise exceptions.AuthenticationFailed(serializer.error_messages['no_active_account'], 'no_active_account')
+        await login_guard.asucceeded(email)
+
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            user.last_login = timezone.now()
+            await user.asave(update_fields=['last_login'])
+
+        refresh = await RefreshToken.afor_user(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token), 'data': UserSerializer(user).data}
+        response = Response(data)
+        set_token_cookies(response, data)
+        return response
+
+
+class AsyncTokenRefreshView(UserTokensInCookieMixin, AsyncAPIView):
+    authentication_classes = ()
+
+    async def post(self, request, *args, **kwargs):
+        serializer = UserTokenRefreshSerializer()
+        attrs = serializer.to_internal_value(request.data)
+
+        refresh = await RefreshToken.averified(attrs['refresh'])
+        try:
+            user = await refresh.aget_user()
+        except User.DoesNotExist:
+            user = None
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed(serializer.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                await refresh.ablacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            await refresh.aoutstand()
+
+            data['refresh'] = str(refresh)
+
+        response = Response(data)
+        set_token_cookies(response, data)
+        return response
+
+
+class AsyncLogoutView(UserTokensInCookieMixin, AsyncAPIView):
+    authentication_classes = ()
+
+    async def post(self, request, *args, **kwargs):
+        attrs = UserTokenBlacklistSerializer().to_internal_value(request.data)
+
+        refresh = await RefreshToken.averified(attrs['refresh'])
+        await refresh.ablacklist()
+
+        response = Response({})
+        delete_token_cookies(response)
+        return response
+
+
+class AsyncPasswordResetView(AsyncAPIView):
+    throttle_classes = (PasswordResetRateThrottle, PasswordResetIPThrottle)
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            email = PasswordResetSerializer().fields['email'].run_validation(request.data.get('email', empty))
+            user = await User.objects.aget_by_email(email)
+            PasswordResetSerializer.check_user(user)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'email': exc.detail})
+
+        # Renders the email and may send it synchronously when the mail queue is full
+        return Response(await sync_to_async(PasswordResetSerializer.send_reset)(user))
@@ -1,4 +1,12 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import user_cache
+from .conf import accounts_setting
+from .tokens import USER_SNAPSHOT_CLAIM, SnapshotUser
 
 
 class JWTAndCookieAuthentication(JWTAuthentication):
@@ -14,3 +22,57 @@ class JWTAndCookieAuthentication(JWTAuthentication):
             result = self.get_user(validated_token), validated_token
 
         return result
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of ``authenticate`` for views running on the event loop.
+        """
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            raw_token = request.COOKIES.get('access_token')
+            if raw_token is None:
+                return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        if accounts_setting('STATELESS_AUTHENTICATION') and USER_SNAPSHOT_CLAIM in validated_token:
+            return SnapshotUser(validated_token)
+
+        try:
+            user = user_cache.get(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        if accounts_setting('STATELESS_AUTHENTICATION') and USER_SNAPSHOT_CLAIM in validated_token:
+            return SnapshotUser(validated_token)
+
+        try:
+            user = await user_cache.aget(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        self.check_user(user, validated_token)
+        return user
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def check_user(user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
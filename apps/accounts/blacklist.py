@@ -0,0 +1,192 @@
+import atexit
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_to_epoch
+
+from utils.cache import LocalLRUCache, TieredCache
+from utils.instrumentation import instrument_cache
+from .conf import accounts_setting
+
+REVOKED = 'revoked'
+OUTSTANDING = 'outstanding'
+
+
+class TokenBlacklistCache:
+    """
+    Answers "is this jti revoked?" without touching the token_blacklist tables when possible.
+
+    Revocations are immutable, so they are remembered in a per-process LRU as well as in the shared
+    cache. "Not revoked" answers are only trusted when they come from a cache shared by every worker,
+    since that is where blacklisting writes through; a process-local alias always confirms them
+    against the database. They are kept ``TOKEN_BLACKLIST_OUTSTANDING_TIMEOUT`` seconds at most, which
+    bounds how long a revocation that bypassed ``BlacklistedToken.save`` (``bulk_create``, raw SQL) is missed.
+    """
+    key_prefix = 'accounts:jti:'
+
+    def __init__(self):
+        self.revoked = LocalLRUCache(
+            maxsize=accounts_setting('TOKEN_BLACKLIST_LOCAL_MAXSIZE'),
+            timeout=api_settings.REFRESH_TOKEN_LIFETIME.total_seconds(),
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        return instrument_cache(caches[accounts_setting('TOKEN_BLACKLIST_ALIAS')])
+
+    @property
+    def shares_negatives(self):
+        # A local tier could keep answering "outstanding" after another process blacklisted the token
+        return not isinstance(caches[accounts_setting('TOKEN_BLACKLIST_ALIAS')], (LocMemCache, DummyCache, TieredCache))
+
+    def make_key(self, jti):
+        return f'{self.key_prefix}{jti}'
+
+    @staticmethod
+    def _timeout(exp):
+        return max(exp - datetime_to_epoch(aware_utcnow()), 1)
+
+    def _outstanding_timeout(self, exp):
+        return min(self._timeout(exp), accounts_setting('TOKEN_BLACKLIST_OUTSTANDING_TIMEOUT'))
+
+    def is_revoked(self, jti, exp):
+        if self.revoked.get(jti):
+            self.hits += 1
+            return True
+
+        state = self.shared.get(self.make_key(jti))
+        if state == REVOKED:
+            self.hits += 1
+            self.revoked.set(jti, True)
+            return True
+        if state == OUTSTANDING and self.shares_negatives:
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            self.mark_revoked(jti, exp)
+            return True
+        self.mark_outstanding(jti, exp)
+        return False
+
+    async def ais_revoked(self, jti, exp):
+        if self.revoked.get(jti):
+            self.hits += 1
+            return True
+
+        state = await self.shared.aget(self.make_key(jti))
+        if state == REVOKED:
+            self.hits += 1
+            self.revoked.set(jti, True)
+            return True
+        if state == OUTSTANDING and self.shares_negatives:
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        if await BlacklistedToken.objects.filter(token__jti=jti).aexists():
+            await self.amark_revoked(jti, exp)
+            return True
+        await self.amark_outstanding(jti, exp)
+        return False
+
+    def mark_outstanding(self, jti, exp):
+        # add() never overwrites a revocation written concurrently by another worker
+        self.shared.add(self.make_key(jti), OUTSTANDING, self._outstanding_timeout(exp))
+
+    def mark_revoked(self, jti, exp):
+        self.revoked.set(jti, True)
+        self.shared.set(self.make_key(jti), REVOKED, self._timeout(exp))
+
+    async def amark_outstanding(self, jti, exp):
+        await self.shared.aadd(self.make_key(jti), OUTSTANDING, self._outstanding_timeout(exp))
+
+    async def amark_revoked(self, jti, exp):
+        self.revoked.set(jti, True)
+        await self.shared.aset(self.make_key(jti), REVOKED, self._timeout(exp))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'local_size': len(self.revoked)}
+
+
+class OutstandingTokenBuffer:
+    """
+    Collects ``OutstandingToken`` rows and inserts them with ``bulk_create``.
+
+    A batch is written once it holds ``OUTSTANDING_TOKEN_BATCH_SIZE`` rows, once its oldest row has
+    waited ``OUTSTANDING_TOKEN_BATCH_INTERVAL`` seconds, or at interpreter exit. Blacklisting a token
+    creates its row on demand, so a pending row never prevents a revocation.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    def add(self, outstanding_token):
+        if accounts_setting('OUTSTANDING_TOKEN_BATCH_SIZE') <= 1:
+            outstanding_token.save()
+            return
+
+        batch = self._append(outstanding_token)
+        if batch:
+            self._write(batch)
+
+    async def aadd(self, outstanding_token):
+        if accounts_setting('OUTSTANDING_TOKEN_BATCH_SIZE') <= 1:
+            await outstanding_token.asave()
+            return
+
+        batch = self._append(outstanding_token)
+        if batch:
+            await OutstandingToken.objects.abulk_create(batch, ignore_conflicts=True)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def _append(self, outstanding_token):
+        with self._lock:
+            self._pending.append(outstanding_token)
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            full = len(self._pending) >= accounts_setting('OUTSTANDING_TOKEN_BATCH_SIZE')
+            stale = time.monotonic() - self._started_at >= accounts_setting('OUTSTANDING_TOKEN_BATCH_INTERVAL')
+            return self._take() if full or stale else None
+
+    def _take(self):
+        batch, self._pending, self._started_at = self._pending, [], None
+        return batch
+
+    @staticmethod
+    def _write(batch):
+        OutstandingToken.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def __len__(self):
+        return len(self._pending)
+
+
+token_blacklist = TokenBlacklistCache()
+outstanding_tokens = OutstandingTokenBuffer()
+
+
+def revoke_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    ``post_save`` receiver of ``BlacklistedToken``, so that tokens blacklisted from the admin or any code
+    not going through ``RefreshToken.blacklist`` are rejected right away.
+    """
+    if created:
+        token = instance.token
+        token_blacklist.mark_revoked(token.jti, datetime_to_epoch(token.expires_at))
+
+atexit.register(outstanding_tokens.flush)
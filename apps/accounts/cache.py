@@ -0,0 +1,113 @@
+import copy
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from utils.cache import LocalLRUCache
+from utils.instrumentation import instrument_cache
+from .conf import accounts_setting
+
+
+class UserCache:
+    """
+    Resolves users by primary key through a per-process LRU backed by the Django cache framework.
+
+    Entries are invalidated when a user is saved. Other processes only drop their local copy when it
+    expires, so a deactivated user stops authenticating after at most ``USER_CACHE_LOCAL_TIMEOUT``
+    seconds when the shared alias is shared between workers, ``USER_CACHE_TIMEOUT`` otherwise.
+    """
+    key_prefix = 'accounts:user:'
+
+    def __init__(self):
+        self.local = LocalLRUCache(
+            maxsize=accounts_setting('USER_CACHE_LOCAL_MAXSIZE'),
+            timeout=accounts_setting('USER_CACHE_LOCAL_TIMEOUT'),
+        )
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def shared(self):
+        return instrument_cache(caches[accounts_setting('USER_CACHE_ALIAS')])
+
+    def make_key(self, pk):
+        return f'{self.key_prefix}{pk}'
+
+    def get(self, pk):
+        """
+        Returns a private copy of the user, raising ``User.DoesNotExist`` when there is none.
+        """
+        from .models import User
+
+        if not accounts_setting('USER_CACHE_ENABLED'):
+            return User.objects.get(pk=pk)
+
+        key = self.make_key(pk)
+        user = self.local.get(key)
+        if user is not None:
+            self.hits += 1
+            return copy.copy(user)
+
+        user = self.shared.get(key)
+        if user is not None:
+            self.shared_hits += 1
+        else:
+            self.misses += 1
+            # A replica lagging behind an invalidating write would get its stale row cached
+            user = User.objects.using(DEFAULT_DB_ALIAS).get(pk=pk)
+            self.shared.set(key, user, accounts_setting('USER_CACHE_TIMEOUT'))
+
+        self.local.set(key, user)
+        return copy.copy(user)
+
+    async def aget(self, pk):
+        """
+        Async counterpart of ``get`` going through the async cache and ORM APIs.
+        """
+        from .models import User
+
+        if not accounts_setting('USER_CACHE_ENABLED'):
+            return await User.objects.aget(pk=pk)
+
+        key = self.make_key(pk)
+        user = self.local.get(key)
+        if user is not None:
+            self.hits += 1
+            return copy.copy(user)
+
+        user = await self.shared.aget(key)
+        if user is not None:
+            self.shared_hits += 1
+        else:
+            self.misses += 1
+            user = await User.objects.using(DEFAULT_DB_ALIAS).aget(pk=pk)
+            await self.shared.aset(key, user, accounts_setting('USER_CACHE_TIMEOUT'))
+
+        self.local.set(key, user)
+        return copy.copy(user)
+
+    def invalidate(self, pk):
+        key = self.make_key(pk)
+        self.invalidations += 1
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.hits = self.shared_hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            'local_size': len(self.local),
+        }
+
+
+user_cache = UserCache()
@@ -0,0 +1,44 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Serve request.user from a snapshot embedded in the access token instead of querying the user table
+    'STATELESS_AUTHENTICATION': False,
+    # Per-process LRU in front of a Django cache alias for user lookups by primary key
+    'USER_CACHE_ENABLED': True,
+    'USER_CACHE_ALIAS': 'default',
+    'USER_CACHE_TIMEOUT': 300,
+    'USER_CACHE_LOCAL_MAXSIZE': 1024,
+    'USER_CACHE_LOCAL_TIMEOUT': 30,
+    # Cached refresh token blacklist membership, "not revoked" answers are only cached on a shared alias
+    'TOKEN_BLACKLIST_ALIAS': 'default',
+    'TOKEN_BLACKLIST_LOCAL_MAXSIZE': 10000,
+    # Seconds a "not revoked" answer is cached, revocations saved through BlacklistedToken apply immediately
+    'TOKEN_BLACKLIST_OUTSTANDING_TIMEOUT': 60,
+    # Cache alias holding the throttle counters, shared by every worker for the limits to be global
+    'THROTTLE_CACHE_ALIAS': 'default',
+    # Failed logins before an account or an IP is locked out, lockout durations and how long failures count
+    'LOGIN_GUARD_ENABLED': True,
+    'LOGIN_FAILURES_PER_ACCOUNT': 5,
+    'LOGIN_FAILURES_PER_IP': 20,
+    'LOGIN_LOCKOUT_BASE': 60,
+    'LOGIN_LOCKOUT_MAX': 3600,
+    'LOGIN_FAILURE_WINDOW': 900,
+    # OutstandingToken rows are written with bulk_create once this many are pending (1 disables batching)
+    'OUTSTANDING_TOKEN_BATCH_SIZE': 1,
+    'OUTSTANDING_TOKEN_BATCH_INTERVAL': 5,
+    # Hashing pool size (None uses the CPU count) and how many hashes may wait for it before answering 503
+    'PASSWORD_HASHING_MAX_WORKERS': None,
+    'PASSWORD_HASHING_QUEUE_SIZE': 16,
+    # Serve login, refresh, logout, account and forgot-password with native async views (ASGI only)
+    'ASYNC_VIEWS': False,
+    # Rows fetched per query and written per streamed chunk by the user export
+    'EXPORT_CHUNK_SIZE': 2000,
+    # Rows accepted by one call to the import API, password hashing processes of the import_users command
+    # (None uses the CPU count)
+    'IMPORT_MAX_ROWS': 1000,
+    'IMPORT_WORKERS': None,
+}
+
+
+def accounts_setting(name):
+    return getattr(settings, 'ACCOUNTS', {}).get(name, DEFAULTS[name])
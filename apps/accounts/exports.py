@@ -0,0 +1,55 @@
+import csv
+import io
+
+from utils.camel_case import CamelCaseJSONRenderer, camelize
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+def iter_representations(queryset, serializer, chunk_size):
+    """
+    ``serializer.to_representation`` of each row, the queryset is read ``chunk_size`` rows at a time and a
+    single serializer instance is reused, so memory does not grow with the number of rows. Serializers with
+    a field plan are given ``.values()`` rows, which skips building model instances.
+    """
+    value_fields = serializer.value_fields() if hasattr(serializer, 'value_fields') else None
+    if value_fields is not None:
+        queryset = queryset.values(*value_fields)
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(instance)
+
+
+def ndjson_chunks(rows, chunk_size):
+    renderer = CamelCaseJSONRenderer()
+    lines = []
+    for row in rows:
+        lines.append(renderer.render(row))
+        if len(lines) >= chunk_size:
+            yield b'\n'.join(lines) + b'\n'
+            lines.clear()
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def csv_chunks(rows, field_names, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(camelize(dict.fromkeys(field_names)).keys())
+    for index, row in enumerate(rows, 1):
+        writer.writerow(row[name] for name in field_names)
+        if index % chunk_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def export_chunks(export_format, queryset, serializer, chunk_size):
+    rows = iter_representations(queryset, serializer, chunk_size)
+    if export_format == 'csv':
+        field_names = [field.field_name for field in serializer._readable_fields]
+        return csv_chunks(rows, field_names, chunk_size)
+    return ndjson_chunks(rows, chunk_size)
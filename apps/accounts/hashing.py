@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .conf import accounts_setting
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Le service est momentanément surchargé, veuillez réessayer.')
+    default_code = 'password_hashing_unavailable'
+    # Surfaced as a Retry-After header by the exception handler
+    wait = 1
+
+
+class PasswordHashingExecutor:
+    """
+    Runs password hashers on a bounded pool of worker threads, started lazily in each (forked) process.
+
+    At most ``PASSWORD_HASHING_MAX_WORKERS`` hashes run at once and ``PASSWORD_HASHING_QUEUE_SIZE`` more
+    may wait for a worker. Anything beyond that is rejected with a 503 instead of queueing, so a burst of
+    logins cannot hold every request thread of the process.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._slots = None
+        self._max_workers = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                max_workers = accounts_setting('PASSWORD_HASHING_MAX_WORKERS') or os.cpu_count() or 1
+                self._pid = os.getpid()
+                self._max_workers = max_workers
+                self._slots = threading.BoundedSemaphore(max_workers + accounts_setting('PASSWORD_HASHING_QUEUE_SIZE'))
+                self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+            return self._pool, self._slots
+
+    def submit(self, func, *args):
+        pool, slots = self._ensure_pool()
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHashingUnavailable()
+        try:
+            future = pool.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def run(self, func, *args):
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def map(self, func, iterable, chunksize=1):
+        """
+        ``Executor.map`` for bulk hashing, e.g. an import. Items wait for their turn instead of being rejected,
+        and at most half of the workers are kept busy so that logins are still served meanwhile.
+        """
+        pool, _slots = self._ensure_pool()
+        in_flight = threading.BoundedSemaphore(max(1, self._max_workers // 2))
+        futures = []
+        for item in iterable:
+            in_flight.acquire()
+            try:
+                future = pool.submit(func, item)
+            except BaseException:
+                in_flight.release()
+                raise
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+
+password_hashing = PasswordHashingExecutor()
+
+
+def make_password(raw_password):
+    if raw_password is None:
+        return hashers.make_password(None)
+    return password_hashing.run(hashers.make_password, raw_password)
+
+
+def check_password(user, raw_password):
+    """
+    ``AbstractBaseUser.check_password`` with the hasher run on the pool.
+
+    Results are remembered on the user instance for its current hash, so that validating the same value
+    twice while handling a request only hashes it once.
+    """
+    checks = user.__dict__.setdefault('_password_checks', {})
+    digest = hashlib.sha256(str(raw_password).encode()).digest()
+    try:
+        return checks[user.password, digest]
+    except KeyError:
+        pass
+
+    is_correct, must_update = password_hashing.run(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.set_password(raw_password)
+        # Password hash upgrades shouldn't be considered password changes
+        user._password = None
+        user.save(update_fields=['password'])
+    checks[user.password, digest] = is_correct
+    return is_correct
+
+
+def _setup_hashing_process(password_hashers):
+    django.setup()
+    settings.PASSWORD_HASHERS = password_hashers
+
+
+def hashing_processes(workers=None):
+    """
+    Worker processes for hashing many passwords at once (``executor.map(hashers.make_password, ...)``).
+
+    They are started with spawn so that forking a threaded server process is never an issue, set Django up
+    from the inherited DJANGO_SETTINGS_MODULE and use the PASSWORD_HASHERS of the calling process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_setup_hashing_process,
+        initargs=(settings.PASSWORD_HASHERS,),
+    )
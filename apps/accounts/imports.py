@@ -0,0 +1,91 @@
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from .models import User
+from .serializers import ImportUserSerializer
+
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+
+def _unique_email_message():
+    field = User._meta.get_field('email')
+    return field.error_messages['unique'] % {'model_name': User._meta.verbose_name, 'field_label': field.verbose_name}
+
+
+def import_users(rows, batch_size=DEFAULT_IMPORT_BATCH_SIZE, executor=None):
+    """
+    Creates users from an iterable of ``CreateUserSerializer`` style dicts, ``batch_size`` rows at a time.
+
+    Each batch is validated row by row, checked for existing emails with a single query, hashed through
+    ``executor.map`` (``hashing.hashing_processes``, ``hashing.password_hashing``, or in this thread without
+    one) and inserted with ``bulk_create`` in its own transaction. Invalid rows are reported and skipped instead of aborting the import: returns
+    the number of users created and the errors of each rejected row by its position in ``rows``.
+    """
+    created = 0
+    errors = []
+    rows = iter(rows)
+    start = 0
+
+    while batch := list(islice(rows, batch_size)):
+        batch_created, batch_errors = _import_batch(list(enumerate(batch, start)), executor)
+        created += batch_created
+        errors += batch_errors
+        start += len(batch)
+
+    return {'created': created, 'errors': errors}
+
+
+def _import_batch(rows, executor):
+    serializer = ImportUserSerializer()
+    errors = []
+    valid = []
+    for index, row in rows:
+        try:
+            data = serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': serializers.as_serializer_error(exc)})
+        else:
+            data['email'] = User.objects.normalize_email(data['email'])
+            valid.append((index, data))
+
+    unique_message = _unique_email_message()
+    # Emails are unique ignoring case, the lookup is served by the lower(email) index
+    existing = set(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=[data['email'].lower() for _, data in valid])
+        .values_list('email_lower', flat=True)
+    )
+    users = []
+    for index, data in valid:
+        if data['email'].lower() in existing:
+            errors.append({'index': index, 'errors': {'email': [unique_message]}})
+            continue
+        existing.add(data['email'].lower())
+        users.append((index, data))
+
+    passwords = [data.pop('password', None) for _, data in users]
+    hashes = executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 64)) if executor \
+        else map(make_password, passwords)
+    users = [(index, User(**data, password=encoded)) for (index, data), encoded in zip(users, hashes)]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users])
+        created = len(users)
+    except IntegrityError:
+        # An email was taken since the check, insert one by one to find which
+        created = 0
+        for index, user in users:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created += 1
+            except IntegrityError:
+                errors.append({'index': index, 'errors': {'email': [unique_message]}})
+
+    errors.sort(key=lambda error: error['index'])
+    return created, errors
@@ -0,0 +1,134 @@
+import time
+
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from utils.cache import shared_backend
+from utils.instrumentation import instrument_cache
+from .conf import accounts_setting
+
+
+class LoginLocked(Throttled):
+    default_detail = _('Trop de tentatives de connexion échouées.')
+    extra_detail_singular = _('Réessayez dans {wait} seconde.')
+    extra_detail_plural = _('Réessayez dans {wait} secondes.')
+    default_code = 'login_locked'
+
+
+class LoginGuard:
+    """
+    Counts failed logins per account and per client IP, and locks either out once it reaches its threshold.
+
+    The first lockout lasts ``LOGIN_LOCKOUT_BASE`` seconds and each failure after it doubles the next one,
+    up to ``LOGIN_LOCKOUT_MAX``. Counters are forgotten ``LOGIN_FAILURE_WINDOW`` seconds after the last
+    failure, the account counter as soon as a login succeeds. Checking costs one ``get_many`` and a failure
+    three cache calls per key, so a rejected attempt never reaches a password hasher.
+    """
+    key_prefix = 'accounts:login:'
+
+    @property
+    def cache(self):
+        return instrument_cache(shared_backend(caches[accounts_setting('THROTTLE_CACHE_ALIAS')]))
+
+    def make_keys(self, email, ip):
+        keys = {}
+        if not accounts_setting('LOGIN_GUARD_ENABLED'):
+            return keys
+        if email:
+            keys[f'{self.key_prefix}email:{email.strip().lower()}'] = accounts_setting('LOGIN_FAILURES_PER_ACCOUNT')
+        if ip:
+            keys[f'{self.key_prefix}ip:{ip}'] = accounts_setting('LOGIN_FAILURES_PER_IP')
+        return keys
+
+    @staticmethod
+    def lock_key(key):
+        return f'{key}:locked'
+
+    @staticmethod
+    def remaining(locks):
+        """
+        Seconds until the latest of ``locks`` (unlock timestamps) expires, None when none is active.
+        """
+        now = time.time()
+        wait = max((unlock_at - now for unlock_at in locks.values()), default=0)
+        return wait if wait > 0 else None
+
+    @staticmethod
+    def lockout(failures, threshold):
+        if failures < threshold:
+            return None
+        return min(accounts_setting('LOGIN_LOCKOUT_BASE') * 2 ** (failures - threshold),
+                   accounts_setting('LOGIN_LOCKOUT_MAX'))
+
+    def check(self, email, ip):
+        """
+        Raises ``LoginLocked`` when the account or the IP is locked out.
+        """
+        wait = self.remaining(self.cache.get_many([self.lock_key(key) for key in self.make_keys(email, ip)]))
+        if wait is not None:
+            raise LoginLocked(wait)
+
+    async def acheck(self, email, ip):
+        wait = self.remaining(await self.cache.aget_many([self.lock_key(key) for key in self.make_keys(email, ip)]))
+        if wait is not None:
+            raise LoginLocked(wait)
+
+    def failed(self, email, ip):
+        window = accounts_setting('LOGIN_FAILURE_WINDOW')
+        for key, threshold in self.make_keys(email, ip).items():
+            self.cache.add(key, 0, window)
+            try:
+                failures = self.cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr()
+                failures = 1
+                self.cache.set(key, failures, window)
+            self.cache.touch(key, window)
+            duration = self.lockout(failures, threshold)
+            if duration is not None:
+                self.cache.set(self.lock_key(key), time.time() + duration, duration)
+
+    async def afailed(self, email, ip):
+        window = accounts_setting('LOGIN_FAILURE_WINDOW')
+        for key, threshold in self.make_keys(email, ip).items():
+            await self.cache.aadd(key, 0, window)
+            try:
+                failures = await self.cache.aincr(key)
+            except ValueError:
+                failures = 1
+                await self.cache.aset(key, failures, window)
+            await self.cache.atouch(key, window)
+            duration = self.lockout(failures, threshold)
+            if duration is not None:
+                await self.cache.aset(self.lock_key(key), time.time() + duration, duration)
+
+    def succeeded(self, email):
+        self.cache.delete_many(list(self.make_keys(email, None)))
+
+    async def asucceeded(self, email):
+        await self.cache.adelete_many(list(self.make_keys(email, None)))
+
+
+login_guard = LoginGuard()
+
+
+def get_client_ip(request):
+    """
+    ``REMOTE_ADDR``, or the address DRF throttles read from X-Forwarded-For when ``NUM_PROXIES`` says how
+    many trusted proxies appended to it. Without it the header is whatever the client sent, which would let
+    it rotate addresses past the per IP limit or lock out someone else's.
+    """
+    if api_settings.NUM_PROXIES is None:
+        return request.META.get('REMOTE_ADDR')
+    return BaseThrottle().get_ident(request)
+
+
+def get_login_attempt(request, username_field):
+    """
+    The email and the client IP of a login request.
+    """
+    email = request.data.get(username_field) if isinstance(request.data, dict) else None
+    return email if isinstance(email, str) else None, get_client_ip(request)
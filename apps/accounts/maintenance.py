@@ -0,0 +1,164 @@
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .models import User
+
+DEFAULT_PRUNE_BATCH_SIZE = 5000
+
+DEFAULT_ADMIN_EMAIL = 'admin@localhost'
+
+
+def prune_expired_tokens(batch_size=DEFAULT_PRUNE_BATCH_SIZE, max_batches=None, pause=0, dry_run=False):
+    """
+    Deletes expired outstanding tokens and their blacklist entries, ``batch_size`` rows at a time.
+
+    Batches walk the primary key upwards so each one only scans from where the previous one stopped,
+    and every batch is its own short transaction. Meant to be called from cron or any task scheduler,
+    ``max_batches`` and ``pause`` bound how long a run holds the tables.
+    """
+    now = timezone.now()
+    last_id = 0
+    batches = outstanding_deleted = blacklisted_deleted = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            OutstandingToken.objects
+            .filter(id__gt=last_id, expires_at__lt=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        last_id = ids[-1]
+        batches += 1
+        if dry_run:
+            outstanding_deleted += len(ids)
+            blacklisted_deleted += BlacklistedToken.objects.filter(token_id__in=ids).count()
+        else:
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+            outstanding_deleted += deleted.get(OutstandingToken._meta.label, 0)
+            blacklisted_deleted += deleted.get(BlacklistedToken._meta.label, 0)
+
+        if pause:
+            time.sleep(pause)
+
+    return {
+        'batches': batches,
+        'outstanding_deleted': outstanding_deleted,
+        'blacklisted_deleted': blacklisted_deleted,
+    }
+
+
+def _table_size(cursor, table):
+    if connection.vendor == 'postgresql':
+        cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+        return cursor.fetchone()[0]
+    if connection.vendor == 'mysql':
+        cursor.execute(
+            'SELECT data_length + index_length FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s',
+            [table],
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+    return None
+
+
+# Columns the auth flows and the pruning job filter on
+EXPECTED_INDEXED_COLUMNS = {
+    OutstandingToken: ('jti', 'user_id', 'expires_at'),
+    BlacklistedToken: ('token_id',),
+}
+
+
+def token_tables_report():
+    """
+    Row counts, on-disk size (PostgreSQL and MySQL only) and index coverage of the token_blacklist tables.
+    """
+    report = {}
+    with connection.cursor() as cursor:
+        for model, expected_columns in EXPECTED_INDEXED_COLUMNS.items():
+            table = model._meta.db_table
+            indexes = {
+                name: constraint['columns']
+                for name, constraint in connection.introspection.get_constraints(cursor, table).items()
+                if constraint['index'] or constraint['unique'] or constraint['primary_key']
+            }
+            leading_columns = {columns[0] for columns in indexes.values() if columns}
+            report[table] = {
+                'rows': model.objects.count(),
+                'size_bytes': _table_size(cursor, table),
+                'indexes': indexes,
+                'unindexed_columns': [column for column in expected_columns if column not in leading_columns],
+            }
+    report[OutstandingToken._meta.db_table]['expired_rows'] = OutstandingToken.objects.filter(
+        expires_at__lt=timezone.now()
+    ).count()
+    return report
+
+
+def auth_queries():
+    """
+    The lookups the auth endpoints run on every request, by name.
+    """
+    return {
+        'user_by_email': User.objects.filter(email__lower_exact='User@Example.com'),
+        'user_by_pk': User.objects.filter(pk=1),
+        'active_users_page': User.objects.filter(is_active=True).order_by('first_name', 'last_name', 'id')[:20],
+        'outstanding_token_by_jti': OutstandingToken.objects.filter(jti='0' * 32),
+        'blacklisted_token_by_jti': BlacklistedToken.objects.filter(token__jti='0' * 32),
+    }
+
+
+def _uses_index(plan):
+    if connection.vendor == 'postgresql':
+        return 'Seq Scan' not in plan
+    if connection.vendor == 'sqlite':
+        # "SCAN table" without "USING ... INDEX" reads the whole table, "SEARCH" always goes through an index
+        return not any(
+            line.strip().startswith('SCAN') and 'INDEX' not in line and 'TEMP B-TREE' not in line
+            for line in plan.splitlines()
+        ) and 'USE TEMP B-TREE FOR ORDER BY' not in plan
+    return None
+
+
+def auth_query_plans():
+    """
+    EXPLAIN output of ``auth_queries`` and whether each one is served by an index (PostgreSQL and SQLite).
+
+    Sequential scans are disabled on PostgreSQL while explaining, so the answer does not depend on the
+    table being too small for the planner to bother with its indexes.
+    """
+    report = {}
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in auth_queries().items():
+            plan = queryset.explain()
+            report[name] = {'plan': plan, 'uses_index': _uses_index(plan)}
+    return report
+
+
+def create_default_admin(using=None):
+    """
+    Creates the ``admin@localhost`` superuser (password "admin") of development databases, returns whether it
+    was created.
+    """
+    user, created = User.objects.db_manager(using).get_or_create(
+        email=DEFAULT_ADMIN_EMAIL,
+        defaults={
+            'first_name': '',
+            'last_name': '',
+        }
+    )
+    if created:
+        user.is_staff = True
+        user.is_superuser = True
+        user.set_password('admin')
+        user.save(using=using)
+    return created
@@ -0,0 +1,267 @@
+import asyncio
+import contextvars
+import json
+import math
+import platform
+import subprocess
+import threading
+import time
+import uuid
+
+import django
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+
+from apps.accounts.cache import user_cache
+from apps.accounts.models import User
+
+ENDPOINTS = ('login', 'account', 'refresh', 'change_password', 'logout', 'register')
+
+_current_sample = contextvars.ContextVar('bench_auth_sample')
+
+
+def count_queries(execute, sql, params, many, context):
+    sample = _current_sample.get(None)
+    if sample is not None:
+        sample['queries'] += 1
+    return execute(sql, params, many, context)
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of sorted ``values``.
+    """
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class AuthFlow:
+    """
+    One iteration logs a user in, reads the account, refreshes, changes the password back and forth,
+    logs out and registers a new user (registration requires authentication). Each call is timed and
+    its queries counted.
+    """
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def request_kwargs(self, name, state):
+        password = state['password']
+        new_password = state['password'][::-1]
+        return {
+            'login': ('post', '/api/auth/login/', {'email': state['email'], 'password': password}, {}),
+            'account': ('get', '/api/auth/account/', None, {'Authorization': f'Bearer {state.get("access")}'}),
+            'refresh': ('post', '/api/auth/token/refresh/', {'refresh': state.get('refresh')}, {}),
+            'change_password': ('post', '/api/auth/change-password/', {
+                'oldPassword': password, 'newPassword': new_password, 'newPasswordConfirmation': new_password,
+            }, {'Authorization': f'Bearer {state.get("access")}'}),
+            'logout': ('post', '/api/auth/logout/', {'refresh': state.get('refresh')}, {}),
+            'register': ('post', '/api/auth/register/', {
+                'email': f'bench-{uuid.uuid4().hex}@example.com', 'password': password,
+                'firstName': 'Bench', 'lastName': 'User',
+            }, {'Authorization': f'Bearer {state.get("access")}'}),
+        }[name]
+
+    def record(self, name, state, response, seconds, queries, keep):
+        ok = response.status_code < 400
+        if keep:
+            self.samples[name].append({'seconds': seconds, 'queries': queries, 'ok': ok})
+        if not ok:
+            return
+        data = response.json()
+        if name == 'login':
+            state['access'], state['refresh'] = data['access'], data['refresh']
+        elif name == 'refresh':
+            state['access'], state['refresh'] = data['access'], data.get('refresh', state['refresh'])
+        elif name == 'change_password':
+            state['password'] = state['password'][::-1]
+
+    def run(self, client, state, record=True):
+        for name in ENDPOINTS:
+            method, path, data, headers = self.request_kwargs(name, state)
+            client.cookies.clear()
+            sample = {'queries': 0}
+            token = _current_sample.set(sample)
+            started = time.perf_counter()
+            try:
+                response = getattr(client, method)(path, data, content_type='application/json', headers=headers) \
+                    if data is not None else client.get(path, headers=headers)
+            finally:
+                _current_sample.reset(token)
+            self.record(name, state, response, time.perf_counter() - started, sample['queries'], keep=record)
+
+    async def arun(self, client, state, record=True):
+        for name in ENDPOINTS:
+            method, path, data, headers = self.request_kwargs(name, state)
+            client.cookies.clear()
+            sample = {'queries': 0}
+            token = _current_sample.set(sample)
+            started = time.perf_counter()
+            try:
+                response = await getattr(client, method)(path, data, content_type='application/json', headers=headers) \
+                    if data is not None else await client.get(path, headers=headers)
+            finally:
+                _current_sample.reset(token)
+            self.record(name, state, response, time.perf_counter() - started, sample['queries'], keep=record)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the /api/auth/ endpoints through the Django test client on a throwaway test database '
+        'and print the latency percentiles, throughput and queries per request as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Users seeded before the run')
+        parser.add_argument('--iterations', type=int, default=100, help='Auth flows run per worker')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed auth flows run per worker first')
+        parser.add_argument('--concurrency', type=int, default=1, help='Workers sharing the users')
+        parser.add_argument('--async', action='store_true', dest='use_async',
+                            help='Drive the ASGI handler with AsyncClient instead of the WSGI one')
+        parser.add_argument('--fast-hashing', action='store_true',
+                            help='Use the MD5 hasher to measure everything but password hashing')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--compare', help='Previous JSON report to print p95 and query deltas against')
+
+    def handle(self, *args, **options):
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hashing'] else None
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+                report = self.benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                self.compare(json.load(file), report)
+
+    def seed(self, count):
+        password = 'bench-password'
+        encoded = make_password(password)
+        User.objects.bulk_create(
+            User(email=f'bench-seed-{index}@example.com', first_name='Bench', last_name=str(index), password=encoded)
+            for index in range(count)
+        )
+        user_cache.clear()
+        return [{'email': f'bench-seed-{index}@example.com', 'password': password} for index in range(count)]
+
+    def benchmark(self, options):
+        concurrency = max(1, options['concurrency'])
+        states = self.seed(max(options['users'], concurrency))
+        samples = {name: [] for name in ENDPOINTS}
+        flow = AuthFlow(samples)
+
+        def worker_states(worker, iterations):
+            worker_states_ = states[worker::concurrency]
+            return (worker_states_[index % len(worker_states_)] for index in range(iterations))
+
+        run = self.run_async if options['use_async'] else self.run_threads
+        run(flow, lambda worker: worker_states(worker, options['warmup']), concurrency, record=False)
+
+        started = time.perf_counter()
+        run(flow, lambda worker: worker_states(worker, options['iterations']), concurrency, record=True)
+        elapsed = time.perf_counter() - started
+
+        return self.build_report(samples, elapsed, options)
+
+    def run_threads(self, flow, worker_states, concurrency, record):
+        def work(worker):
+            client = Client()
+            with connection.execute_wrapper(count_queries):
+                for state in worker_states(worker):
+                    flow.run(client, state, record)
+            connection.close()
+
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_async(self, flow, worker_states, concurrency, record):
+        async def work(worker):
+            client = AsyncClient()
+            for state in worker_states(worker):
+                await flow.arun(client, state, record)
+
+        async def run():
+            await asyncio.gather(*(work(worker) for worker in range(concurrency)))
+
+        # Thread sensitive ORM calls and sync views run on this thread when the loop is driven by async_to_sync
+        with connection.execute_wrapper(count_queries):
+            async_to_sync(run)()
+
+    def build_report(self, samples, elapsed, options):
+        endpoints = {}
+        for name, endpoint_samples in samples.items():
+            latencies = sorted(sample['seconds'] * 1000 for sample in endpoint_samples)
+            count = len(endpoint_samples)
+            endpoints[name] = {
+                'requests': count,
+                'errors': sum(not sample['ok'] for sample in endpoint_samples),
+                'mean_ms': sum(latencies) / count if count else None,
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+                'queries_per_request': sum(sample['queries'] for sample in endpoint_samples) / count if count else None,
+            }
+
+        requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+        return {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'handler': 'asgi' if options['use_async'] else 'wsgi',
+                'users': max(options['users'], options['concurrency']),
+                'iterations': options['iterations'],
+                'concurrency': options['concurrency'],
+                'fast_hashing': options['fast_hashing'],
+            },
+            'total': {
+                'requests': requests,
+                'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+                'seconds': elapsed,
+                'throughput_rps': requests / elapsed if elapsed else None,
+            },
+            'endpoints': endpoints,
+        }
+
+    def compare(self, baseline, report):
+        self.stderr.write(f'Compared to {baseline["meta"].get("revision")}:')
+        for name, endpoint in report['endpoints'].items():
+            previous = baseline['endpoints'].get(name)
+            if not previous or not previous['p95_ms'] or endpoint['p95_ms'] is None:
+                continue
+            change = (endpoint['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            queries = endpoint['queries_per_request'] - previous['queries_per_request']
+            self.stderr.write(f'{name:>16}: p95 {endpoint["p95_ms"]:8.2f} ms ({change:+6.1f}%), queries {queries:+.2f}')
@@ -0,0 +1,64 @@
+import timeit
+from collections import OrderedDict
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from djangorestframework_camel_case.parser import CamelCaseJSONParser as LibraryCamelCaseJSONParser
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+from io import BytesIO
+
+from apps.accounts.models import User
+from apps.accounts.serializers import UserSerializer
+from utils.camel_case import CamelCaseJSONParser, CamelCaseJSONRenderer
+
+
+def paginated_users(count):
+    """
+    The payload of a ``paginated_response`` page of ``count`` users, built without touching the database.
+    """
+    now = timezone.now()
+    users = [
+        User(
+            pk=index, email=f'user-{index}@example.com', first_name='Prénom', last_name=f'Nom {index}',
+            is_active=True, is_staff=index % 10 == 0, date_joined=now, last_login=now if index % 2 else None,
+        )
+        for index in range(count)
+    ]
+    return OrderedDict([
+        ('count', count * 10),
+        ('next', 'http://testserver/api/users/?page=2'),
+        ('previous', None),
+        ('results', UserSerializer(users, many=True).data),
+    ])
+
+
+class Command(BaseCommand):
+    help = 'Compare the camelCase JSON renderer and parser with the djangorestframework-camel-case ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=200)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        data = paginated_users(options['page_size'])
+        iterations = options['iterations']
+
+        library_content = LibraryCamelCaseJSONRenderer().render(data)
+        content = CamelCaseJSONRenderer().render(data)
+        if content != library_content:
+            raise CommandError('The renderers produced different bytes')
+        if CamelCaseJSONParser().parse(BytesIO(content)) != LibraryCamelCaseJSONParser().parse(BytesIO(content)):
+            raise CommandError('The parsers produced different data')
+
+        self.stdout.write(f'{options["page_size"]} users, {len(content)} bytes')
+        benchmarks = (
+            ('render', LibraryCamelCaseJSONRenderer(), CamelCaseJSONRenderer(), lambda renderer: renderer.render(data)),
+            ('parse', LibraryCamelCaseJSONParser(), CamelCaseJSONParser(),
+             lambda parser: parser.parse(BytesIO(content))),
+        )
+        for name, library, project, func in benchmarks:
+            before = min(timeit.repeat(lambda: func(library), number=iterations, repeat=3)) / iterations
+            after = min(timeit.repeat(lambda: func(project), number=iterations, repeat=3)) / iterations
+            self.stdout.write(
+                f'{name:>7}: {before * 1e3:8.2f} ms -> {after * 1e3:8.2f} ms ({before / after:4.1f}x)'
+            )
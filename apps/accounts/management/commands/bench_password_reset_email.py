@@ -0,0 +1,36 @@
+import secrets
+import timeit
+
+from django.core.management import BaseCommand
+from django.template.loader import render_to_string
+
+from apps.accounts.serializers import password_reset_email
+from utils import htmltotext
+
+
+def _verification_code():
+    return ''.join(str(secrets.randbelow(10)) for _ in range(6))
+
+
+def render_uncached():
+    html = render_to_string('auth/password_reset_email.html', {'verification_code': _verification_code()})
+    return html, htmltotext.__wrapped__(html)
+
+
+def render_cached():
+    return password_reset_email.render(verification_code=_verification_code())
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-request cost of rendering the password reset email with and without caching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        render_cached()
+
+        for name, func in (('uncached', render_uncached), ('cached', render_cached)):
+            seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+            self.stdout.write(f'{name:>8}: {seconds / iterations * 1e6:10.1f} us/render')
@@ -0,0 +1,58 @@
+import timeit
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.accounts.models import User
+from apps.accounts.serializers import UserSerializer
+
+
+class ModelUserSerializer(serializers.ModelSerializer):
+    """
+    ``UserSerializer`` without its field plan, as DRF serializes it.
+    """
+
+    class Meta(UserSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+def make_users(count):
+    now = timezone.now()
+    return [
+        User(
+            pk=index, email=f'user-{index}@example.com', first_name='Prénom', last_name=f'Nom {index}',
+            is_active=True, is_staff=index % 10 == 0, date_joined=now, last_login=now if index % 2 else None,
+        )
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare UserSerializer and its field plan with a plain ModelSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        users = make_users(options['count'])
+        rows = [{source: getattr(user, source) for source in UserSerializer.value_fields()} for user in users]
+
+        expected = ModelUserSerializer(users, many=True).data
+        if UserSerializer(users, many=True).data != expected or UserSerializer(rows, many=True).data != expected:
+            raise CommandError('The serializers produced different data')
+
+        self.stdout.write(f'{len(users)} users')
+        # values() rows are compared with serializing model instances, which they replace
+        benchmarks = (
+            ('one per user', lambda serializer, items: [serializer(item).data for item in items], users),
+            ('many=True', lambda serializer, items: serializer(items, many=True).data, users),
+            ('values() rows', lambda serializer, items: serializer(items, many=True).data, rows),
+        )
+        for name, func, items in benchmarks:
+            before = min(timeit.repeat(lambda: func(ModelUserSerializer, users), number=1, repeat=options['repeat']))
+            after = min(timeit.repeat(lambda: func(UserSerializer, items), number=1, repeat=options['repeat']))
+            self.stdout.write(
+                f'{name:>14}: {before * 1e3:8.1f} ms -> {after * 1e3:8.1f} ms ({before / after:4.1f}x)'
+            )
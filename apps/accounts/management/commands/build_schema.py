@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.utils import translation
+from drf_spectacular.settings import spectacular_settings
+from rest_framework.settings import api_settings
+
+from config.schema import RENDERERS, document_name, generate_document, write_document
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served at /api/schema/ into SCHEMA_CACHE_DIR, run it on each deploy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lang', action='append', help='Defaults to LANGUAGE_CODE, repeat for several')
+        parser.add_argument('--api-version', action='append', help='Defaults to the ALLOWED_VERSIONS or DEFAULT_VERSION of DRF')
+        parser.add_argument('--directory', default=getattr(settings, 'SCHEMA_CACHE_DIR', None))
+
+    def handle(self, *args, **options):
+        if not options['directory']:
+            raise CommandError('Set SCHEMA_CACHE_DIR or pass --directory')
+        directory = Path(options['directory'])
+        languages = options['lang'] or [settings.LANGUAGE_CODE]
+        versions = options['api_version'] or api_settings.ALLOWED_VERSIONS or [api_settings.DEFAULT_VERSION]
+
+        # Documents of a previous deploy would otherwise be served for versions or languages no longer built
+        for path in directory.glob('schema-*'):
+            path.unlink()
+
+        generator_class = spectacular_settings.DEFAULT_GENERATOR_CLASS
+        for lang in languages:
+            with translation.override(lang):
+                for version in versions:
+                    for schema_format in RENDERERS:
+                        name = document_name(version, translation.get_language(), schema_format)
+                        document = generate_document(generator_class, version, schema_format)
+                        write_document(directory, name, document)
+                        sizes = ', '.join(
+                            f'{encoding} {len(content)}' for encoding, content in document.encodings.items()
+                        )
+                        self.stdout.write(f'{name}: {len(document.content)} bytes ({sizes})')
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.core.management import BaseCommand
 
-from apps.accounts.models import User
+from apps.accounts.maintenance import create_default_admin
 
 
 class Command(BaseCommand):
@@ -14,18 +14,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('This command can only be used in debug mode'))
             return
 
-        user, created = User.objects.get_or_create(
-            email='admin@localhost',
-            defaults={
-                'first_name': '',
-                'last_name': '',
-            }
-        )
-        if created:
-            user.is_staff = True
-            user.is_superuser = True
-            user.set_password('admin')
-            user.save()
+        if create_default_admin():
             self.stdout.write(self.style.SUCCESS('Admin user created successfully'))
         else:
             self.stdout.write(self.style.NOTICE('Admin user already exists'))
@@ -0,0 +1,19 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from apps.accounts.maintenance import auth_query_plans
+
+
+class Command(BaseCommand):
+    help = 'Print the query plans of the auth lookups and fail when one of them does not use an index'
+
+    requires_migrations_checks = True
+
+    def handle(self, *args, **options):
+        report = auth_query_plans()
+        self.stdout.write(json.dumps(report, indent=2))
+
+        unindexed = [name for name, query in report.items() if query['uses_index'] is False]
+        if unindexed:
+            raise CommandError(f'Not served by an index: {", ".join(unindexed)}')
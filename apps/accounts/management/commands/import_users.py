@@ -0,0 +1,69 @@
+import csv
+import json
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+from apps.accounts.conf import accounts_setting
+from apps.accounts.hashing import hashing_processes
+from apps.accounts.imports import DEFAULT_IMPORT_BATCH_SIZE, import_users
+from utils.camel_case import underscoreize
+
+
+def read_rows(file, file_format):
+    """
+    Rows of a CSV file with a header or of a JSON lines file, with camelCase or snake_case keys like the export.
+    """
+    if file_format == 'csv':
+        rows = csv.DictReader(file)
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
+    for row in rows:
+        yield underscoreize(row) if isinstance(row, dict) else row
+
+
+class Command(BaseCommand):
+    help = 'Create users in bulk from a CSV or JSON lines file, reporting the rows that could not be imported'
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - reads stdin')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_IMPORT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=accounts_setting('IMPORT_WORKERS'),
+                            help='Password hashing processes, defaults to the CPU count (0 hashes in this process)')
+        parser.add_argument('--errors', help='Write the rejected rows as JSON to this file instead of stderr')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        try:
+            file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        try:
+            rows = read_rows(file, file_format)
+            if options['workers'] == 0:
+                result = import_users(rows, batch_size=options['batch_size'])
+            else:
+                with hashing_processes(options['workers']) as executor:
+                    result = import_users(rows, batch_size=options['batch_size'], executor=executor)
+        except (ValueError, csv.Error) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        if result['errors']:
+            report = json.dumps(result['errors'], indent=2, ensure_ascii=False)
+            if options['errors']:
+                with open(options['errors'], 'w', encoding='utf-8') as errors_file:
+                    errors_file.write(report + '\n')
+            else:
+                self.stderr.write(report)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} users, rejected {len(result['errors'])} rows"
+        ))
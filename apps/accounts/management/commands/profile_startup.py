@@ -0,0 +1,116 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+
+# Run in a fresh interpreter, each phase of a worker boot up to the point it can resolve its first request
+PROBE = '''
+import json, time
+timings = {}
+started = time.perf_counter()
+
+def phase(name):
+    global started
+    now = time.perf_counter()
+    timings[name] = (now - started) * 1000
+    started = now
+
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phase('settings')
+django.setup()
+phase('apps')
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+phase('middleware')
+from django.urls import resolve
+resolve('/api/auth/account/')
+phase('urls')
+print(json.dumps(timings))
+'''
+
+
+def parse_importtime(stderr):
+    """
+    ``(module, self_us, cumulative_us, depth)`` of each line ``python -X importtime`` wrote to ``stderr``.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def owner(module, app_modules):
+    """
+    The installed app whose package contains ``module``, its top level package otherwise.
+    """
+    for app_module in app_modules:
+        if module == app_module or module.startswith(app_module + '.'):
+            return app_module
+    return module.partition('.')[0]
+
+
+class Command(BaseCommand):
+    help = 'Report the boot time of a worker per phase, and the import time per installed app and module'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Boots to run, the fastest one is reported')
+        parser.add_argument('--limit', type=int, default=15, help='Rows per table')
+        parser.add_argument('--json', action='store_true', help='Print the whole report as JSON')
+
+    def boot(self):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE], capture_output=True, text=True, env=os.environ,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        boots = [self.boot() for _ in range(max(options['repeat'], 1))]
+        timings, modules = min(boots, key=lambda boot: sum(boot[0].values()))
+
+        # Longest names first, so that e.g. django.contrib.admin wins over django
+        app_modules = sorted((config.name for config in apps.get_app_configs()), key=len, reverse=True)
+        by_owner = defaultdict(int)
+        for module, self_us, _cumulative_us, _depth in modules:
+            by_owner[owner(module, app_modules)] += self_us
+
+        limit = options['limit']
+        report = {
+            'phases_ms': timings,
+            'total_ms': sum(timings.values()),
+            'imports_ms': sum(self_us for _module, self_us, _cumulative, _depth in modules) / 1000,
+            'by_app_ms': {
+                name: self_us / 1000 for name, self_us in sorted(by_owner.items(), key=lambda item: -item[1])[:limit]
+            },
+            'top_level_imports_ms': {
+                module: cumulative_us / 1000
+                for module, _self_us, cumulative_us, depth in sorted(modules, key=lambda item: -item[2])
+                if depth == 0
+            },
+        }
+        report['top_level_imports_ms'] = dict(list(report['top_level_imports_ms'].items())[:limit])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'Boot: {report["total_ms"]:.1f} ms, of which imports {report["imports_ms"]:.1f} ms')
+        for name, duration in timings.items():
+            self.stdout.write(f'  {name:<12}{duration:8.1f} ms')
+        self.stdout.write('Import time per installed app (or top level package):')
+        for name, duration in report['by_app_ms'].items():
+            self.stdout.write(f'  {name:<40}{duration:8.1f} ms')
+        self.stdout.write('Slowest imports, with what they import:')
+        for name, duration in report['top_level_imports_ms'].items():
+            self.stdout.write(f'  {name:<40}{duration:8.1f} ms')
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management import BaseCommand
+
+from apps.accounts.maintenance import DEFAULT_PRUNE_BATCH_SIZE, prune_expired_tokens, token_tables_report
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding/blacklisted tokens in bounded batches'
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_PRUNE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Count the rows that would be deleted')
+        parser.add_argument('--report', action='store_true', help='Print table sizes and index coverage')
+
+    def handle(self, *args, **options):
+        if options['report']:
+            self.stdout.write(json.dumps(token_tables_report(), indent=2))
+            return
+
+        result = prune_expired_tokens(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['outstanding_deleted']} outstanding and {result['blacklisted_deleted']} "
+            f"blacklisted tokens in {result['batches']} batches"
+        ))
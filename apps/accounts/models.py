@@ -1,9 +1,44 @@
 from django.contrib.auth.models import AbstractUser, UserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
 from django.utils.translation import gettext_lazy as _
 
+from . import hashing
+from .cache import user_cache
+
+
+class LowerExact(Exact):
+    """
+    ``lower(field) = lower(value)``, the expression the case-insensitive email index is built on.
+    """
+    lookup_name = 'lower_exact'
+
+    def __init__(self, lhs, rhs):
+        if not hasattr(rhs, 'resolve_expression'):
+            rhs = models.Value(rhs, output_field=lhs.output_field)
+        super().__init__(Lower(lhs), Lower(rhs))
+
+    def get_rhs_op(self, connection, rhs):
+        return connection.operators['exact'] % rhs
+
 
 class _UserManager(UserManager):
+    def get_by_natural_key(self, username):
+        return self.get(email__lower_exact=username)
+
+    async def aget_by_natural_key(self, username):
+        return await self.aget(email__lower_exact=username)
+
+    def get_by_email(self, email):
+        """
+        The user whose email matches ``email`` ignoring case, or None.
+        """
+        return self.filter(email__lower_exact=email).first()
+
+    async def aget_by_email(self, email):
+        return await self.filter(email__lower_exact=email).afirst()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError(_('The Email field must be set'))
@@ -25,6 +60,17 @@ class User(AbstractUser):
         verbose_name = _('Utilisateur')
         verbose_name_plural = _('Utilisateurs')
         ordering = ['first_name', 'last_name', ]
+        indexes = [
+            # The default ordering, with the primary key to make it unique for keyset pagination
+            models.Index(fields=['first_name', 'last_name', 'id'], name='accounts_user_name_idx'),
+            models.Index(
+                fields=['first_name', 'last_name', 'id'], condition=models.Q(is_active=True),
+                name='accounts_user_active_name_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='accounts_user_email_ci_unique'),
+        ]
 
     username = None
     email = models.EmailField(_("Email"), unique=True)
@@ -33,6 +79,19 @@ class User(AbstractUser):
 
     objects = _UserManager()
 
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        return hashing.check_password(self, raw_password)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        user_cache.invalidate(self.pk)
+        # A concurrent request may have cached the previous row before the transaction committed
+        transaction.on_commit(lambda pk=self.pk: user_cache.invalidate(pk))
+
     def delete(self, **kwargs):
         self.is_active = False
         self.save(update_fields=['is_active'])
@@ -40,3 +99,6 @@ class User(AbstractUser):
 
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
+
+
+User._meta.get_field('email').register_lookup(LowerExact)
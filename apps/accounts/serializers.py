@@ -1,24 +1,38 @@
+import hashlib
 import secrets
 from base64 import b64encode, b64decode
 from datetime import timedelta
 
+from django.contrib.auth.models import update_last_login
 from django.core import signing
-from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.utils.crypto import constant_time_compare, salted_hmac
 from django.utils.encoding import force_bytes, force_str
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import inline_serializer
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-
-from utils import htmltotext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer, TokenObtainPairSerializer, \
+    TokenObtainSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from utils.mail import EmailTemplate, get_mail_queue
+from utils.serializers import FieldPlanListSerializer, FieldPlanMixin
+from . import hashing
+from .cache import user_cache
+from .conf import accounts_setting
 from .models import User
+from .tokens import RefreshToken
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(FieldPlanMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         exclude = ('groups', 'user_permissions', 'is_superuser', 'password')
         read_only_fields = ['id', 'date_joined', 'last_login', 'is_active', 'is_staff']
+        list_serializer_class = FieldPlanListSerializer
 
 
 class CreateUserSerializer(UserSerializer):
@@ -26,18 +40,68 @@ class CreateUserSerializer(UserSerializer):
         exclude = ('groups', 'user_permissions', 'is_superuser')
         extra_kwargs = {'password': {'write_only': True}}
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # Same query as the case-insensitive unique index on email
+        for validator in fields['email'].validators:
+            if isinstance(validator, UniqueValidator):
+                validator.lookup = 'lower_exact'
+        return fields
+
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
 
 class WithUserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RefreshToken
 
     def validate(self, attrs):
-        data = super().validate(attrs)
+        data = TokenObtainSerializer.validate(self, attrs)
+
+        # last_login is updated before the tokens are built so that the user snapshot they carry is current
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+
+        refresh = self.get_token(self.user)
+        data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
         data['data'] = UserSerializer(self.user).data
         return data
 
 
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        # Loaded through the user cache, unlike simplejwt which queries the user table on every refresh
+        try:
+            user = refresh.get_user()
+        except User.DoesNotExist:
+            user = None
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+class UserTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = RefreshToken
+
+
 class PasswordChangeSerializer(serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
     new_password = serializers.CharField(write_only=True, min_length=8)
@@ -72,76 +136,115 @@ class PasswordChangeSerializer(serializers.Serializer):
         return {'message': _('Mot de passe changé')}
 
 
+password_reset_email = EmailTemplate('auth/password_reset_email.html', placeholders={'verification_code': 6})
+
+
+def verification_code_hash(uid, verification_code):
+    """
+    Keyed hash of the code sent by email, the signed reset token is readable by its holder and only carries this.
+    """
+    return salted_hmac('apps.accounts.password_reset', f'{uid}:{verification_code}').hexdigest()
+
+
 class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField(write_only=True)
     token = serializers.CharField(read_only=True)
-    verification_code = serializers.CharField(read_only=True)
 
-    def validate_email(self, value):
-        try:
-            user = User.objects.get(email=value)
-        except User.DoesNotExist:
+    @staticmethod
+    def check_user(user):
+        if user is None:
             raise serializers.ValidationError(_("Il n'existe pas d'utilisateur avec cet email."))
 
         if not user.is_active:
             raise serializers.ValidationError(_("Cet utilisateur est désactivé."))
 
-        return value
-
-    def validate(self, attrs):
-        email = attrs.get('email')
-        user = User.objects.get(email=email)
+    @staticmethod
+    def send_reset(user):
+        """
+        Queues the reset email for ``user`` and returns the ``token`` to confirm the reset with, the
+        verification code is only ever sent by email.
+        """
         verification_code = ''.join(list(map(lambda _: str(secrets.randbelow(10)), range(6))))
+        uid = force_str(b64encode(force_bytes(user.pk)))
+        token = signing.dumps({'uid': uid, 'code': verification_code_hash(uid, verification_code)})
 
-        html_content = render_to_string('auth/password_reset_email.html', {'verification_code': verification_code})
-        text_content = htmltotext(html_content)
-        user.email_user(
-            subject=_("Réinitialisation de mot de passe"),
-            message=text_content,
+        html_content, text_content = password_reset_email.render(verification_code=verification_code)
+        message = EmailMultiAlternatives(
+            subject=str(_("Réinitialisation de mot de passe")),
+            body=text_content,
             from_email="security@example.com",
-            html_message=html_content,
+            to=[user.email],
         )
+        message.attach_alternative(html_content, 'text/html')
+        get_mail_queue().enqueue(message)
+
+        return {'token': token}
 
-        attrs['verification_code'] = verification_code
-        attrs['token'] = signing.dumps({
-            'uid': b64encode(force_bytes(user.pk)),
-            'verification_code': verification_code
-        })
+    def validate_email(self, value):
+        self.user = User.objects.get_by_email(value)
+        self.check_user(self.user)
+        return value
+
+    def validate(self, attrs):
+        attrs.update(self.send_reset(self.user))
         return attrs
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
+    """
+    Verifies the reset token without touching the database, the password is then set with a single
+    conditional UPDATE on an active user. Each token can only be used once, and its code only guessed
+    ``max_attempts`` times.
+    """
     token = serializers.CharField(write_only=True)
     verification_code = serializers.CharField(write_only=True)
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirmation = serializers.CharField(write_only=True, min_length=8)
     message = serializers.CharField(read_only=True)
 
+    token_max_age = timedelta(minutes=3)
+    max_attempts = 5
+
     def validate(self, attrs):
         if attrs['password'] != attrs['password_confirmation']:
             raise serializers.ValidationError(_("Les deux mots de passe ne correspondent pas."))
 
         try:
-            token_data = signing.loads(attrs['token'], max_age=timedelta(minutes=3))
-            uid = token_data['uid']
-
-            if attrs['verification_code'] != token_data['verification_code']:
-                raise serializers.ValidationError(_("Le code de vérification est incorrect."))
-
-            user_id = force_str(b64decode(uid))
-            user = User.objects.filter(pk=user_id).first()
-
-            if not user:
-                raise serializers.ValidationError(_("L'utilisateur n'existe pas."))
-
-            if not user.is_active:
-                raise serializers.ValidationError(_("Cet utilisateur est désactivé."))
+            token_data = signing.loads(attrs['token'], max_age=self.token_max_age)
+            uid, code = token_data['uid'], token_data['code']
+            attrs['user_id'] = int(force_str(b64decode(uid)))
+        except (signing.BadSignature, signing.SignatureExpired, KeyError, TypeError, ValueError, OverflowError):
+            raise serializers.ValidationError(_("Le token est expiré ou invalide."))
 
-        except (signing.BadSignature, signing.SignatureExpired, TypeError, ValueError, OverflowError):
+        token_key = hashlib.sha256(attrs['token'].encode()).hexdigest()
+        timeout = self.token_max_age.total_seconds()
+        attempts_key = 'password_reset_attempts:' + token_key
+        cache.add(attempts_key, 0, timeout=timeout)
+        try:
+            attempts = cache.incr(attempts_key)
+        except ValueError:
+            # Expired along with the token
+            attempts = self.max_attempts + 1
+        if attempts > self.max_attempts:
             raise serializers.ValidationError(_("Le token est expiré ou invalide."))
+        if not constant_time_compare(verification_code_hash(uid, attrs['verification_code']), code):
+            raise serializers.ValidationError(_("Le code de vérification est incorrect."))
 
+        if not cache.add('password_reset_used:' + token_key, True, timeout=timeout):
+            raise serializers.ValidationError(_("Le token est expiré ou invalide."))
         return attrs
 
+    def save(self, **kwargs):
+        user_id = self.validated_data['user_id']
+        updated = User.objects.filter(pk=user_id, is_active=True).update(
+            password=hashing.make_password(self.validated_data['password'])
+        )
+        if not updated:
+            raise serializers.ValidationError(_("L'utilisateur n'existe pas ou est désactivé."))
+        # update() bypasses User.save()
+        user_cache.invalidate(user_id)
+
+    @property
     def data(self):
         return {'message': _('Mot de passe réinitialisé')}
 
@@ -161,3 +264,39 @@ UserRefreshTokenSerializer = inline_serializer(
         'refresh': serializers.CharField(required=False),
     }
 )
+
+
+class UserExportQuerySerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+
+
+class ImportUserSerializer(CreateUserSerializer):
+    """
+    ``CreateUserSerializer`` without the per-row email uniqueness query, ``apps.accounts.imports`` checks
+    a whole batch at once.
+    """
+
+    class Meta(CreateUserSerializer.Meta):
+        extra_kwargs = {**CreateUserSerializer.Meta.extra_kwargs, 'email': {'validators': []}}
+
+
+class UserImportSerializer(serializers.Serializer):
+    users = serializers.ListField(allow_empty=False)
+
+    def validate_users(self, value):
+        max_rows = accounts_setting('IMPORT_MAX_ROWS')
+        if len(value) > max_rows:
+            raise serializers.ValidationError(
+                _("Pas plus de %(max_rows)s utilisateurs par import.") % {'max_rows': max_rows}
+            )
+        return value
+
+
+class UserImportErrorSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    errors = serializers.DictField()
+
+
+class UserImportReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    errors = UserImportErrorSerializer(many=True)
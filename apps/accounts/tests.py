@@ -1 +1,1073 @@
-# Create your tests here.
+import csv
+import gzip
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zoneinfo
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core import mail, signing
+from django.core.cache import caches
+from django.core.handlers.base import BaseHandler
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone, translation
+from django.utils.translation import gettext_lazy
+from djangorestframework_camel_case.parser import CamelCaseJSONParser as UpstreamCamelCaseJSONParser
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as UpstreamCamelCaseJSONRenderer
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import serializers
+from rest_framework.generics import GenericAPIView
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from config.middleware import DatabaseRoutingMiddleware
+from config.pagination import KeysetPagination, paginated_response
+from config.schema import schema_store
+from config.warmup import send_requests, warm_resolvers, warm_up
+from utils import db, htmltotext
+from utils.cache import TieredCache, build_caches, cache_stats, parse_cache_url, shared_backend
+from utils.camel_case import CamelCaseJSONParser, CamelCaseJSONRenderer
+from utils.instrumentation import BudgetExceeded, Histogram, registry
+from utils.mail import EmailTemplate, ThreadMailQueue, get_mail_queue
+from .async_views import AsyncAccountView, AsyncPasswordResetView, AsyncTokenObtainPairView
+from .blacklist import outstanding_tokens, token_blacklist
+from .cache import user_cache
+from .hashing import PasswordHashingExecutor
+from .imports import import_users
+from .management.commands.bench_auth import ENDPOINTS, AuthFlow, Command as BenchAuthCommand, count_queries, \
+    percentile
+from .management.commands.bench_serializers import ModelUserSerializer, make_users
+from .maintenance import auth_query_plans, prune_expired_tokens, token_tables_report
+from .models import User
+from .serializers import CreateUserSerializer, PasswordResetSerializer, UserSerializer, password_reset_email
+from .tokens import RefreshToken, SnapshotUser
+from .throttles import FixedWindowRateThrottle
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    user_cache.clear()
+
+
+def login(client, email, password):
+    response = client.post('/api/auth/login/', {'email': email, 'password': password}, content_type='application/json')
+    # Tests pass the tokens explicitly
+    client.cookies.clear()
+    return response
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PasswordResetTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='reset@example.com', password='old-password-1')
+
+    def forgot_password(self, email='reset@example.com'):
+        response = self.client.post('/api/auth/forgot-password/', {'email': email}, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(get_mail_queue().flush(timeout=5))
+        return response.json(), re.search(r'\d{6}', mail.outbox[-1].body).group()
+
+    def reset_password(self, token, verification_code, password='new-password-1'):
+        return self.client.post('/api/auth/reset-password/', {
+            'token': token, 'verificationCode': verification_code,
+            'password': password, 'passwordConfirmation': password,
+        }, content_type='application/json')
+
+    def test_verification_code_only_sent_by_email(self):
+        data, verification_code = self.forgot_password()
+        self.assertEqual(list(data), ['token'])
+        self.assertNotIn(verification_code, str(signing.loads(data['token'])))
+
+    async def test_async_verification_code_only_sent_by_email(self):
+        request = AsyncRequestFactory().post(
+            '/api/auth/forgot-password/', {'email': 'reset@example.com'}, content_type='application/json',
+        )
+        send_reset = PasswordResetSerializer.send_reset
+        threads = []
+
+        def record_thread(user):
+            threads.append(threading.get_ident())
+            return send_reset(user)
+
+        with mock.patch.object(PasswordResetSerializer, 'send_reset', record_thread):
+            response = await AsyncPasswordResetView.as_view()(request)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(list(json.loads(response.content)), ['token'])
+        # Not on the event loop
+        self.assertNotEqual(threads, [threading.get_ident()])
+
+    def test_reset(self):
+        data, verification_code = self.forgot_password()
+        response = self.reset_password(data['token'], verification_code)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-password-1'))
+        # Tokens are single use
+        self.assertEqual(self.reset_password(data['token'], verification_code).status_code, 400)
+
+    def test_wrong_verification_code(self):
+        data, verification_code = self.forgot_password()
+        wrong_code = f'{(int(verification_code) + 1) % 1000000:06d}'
+        self.assertEqual(self.reset_password(data['token'], wrong_code).status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('old-password-1'))
+
+    def test_verification_code_attempts(self):
+        data, verification_code = self.forgot_password()
+        wrong_code = f'{(int(verification_code) + 1) % 1000000:06d}'
+        for _ in range(5):
+            self.reset_password(data['token'], wrong_code)
+        self.assertEqual(self.reset_password(data['token'], verification_code).status_code, 400)
+
+    def test_inactive_user(self):
+        data, verification_code = self.forgot_password()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.reset_password(data['token'], verification_code).status_code, 400)
+
+    def test_forgot_password_queries(self):
+        with self.assertNumQueries(1):
+            self.forgot_password(email='RESET@example.com')
+
+    def test_reset_password_queries(self):
+        data, verification_code = self.forgot_password()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.reset_password(data['token'], verification_code).status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='async@example.com', password='password-123')
+        self.factory = AsyncRequestFactory()
+
+    async def test_login(self):
+        request = self.factory.post(
+            '/api/auth/login/', {'email': 'async@example.com', 'password': 'password-123'},
+            content_type='application/json',
+        )
+        response = await AsyncTokenObtainPairView.as_view()(request)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual({'access', 'refresh', 'data'}, set(json.loads(response.content)))
+        self.assertIn('access_token', response.cookies)
+
+        access = json.loads(response.content)['access']
+        request = self.factory.get('/api/auth/account/', headers={'Authorization': f'Bearer {access}'})
+        response = await AsyncAccountView.as_view()(request)
+        self.assertEqual(response.status_code, 200, response.content)
+
+    async def test_options(self):
+        response = await AsyncTokenObtainPairView.as_view()(self.factory.options('/api/auth/login/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('POST', response['Allow'])
+
+        response = await AsyncAccountView.as_view()(self.factory.options('/api/auth/account/'))
+        self.assertEqual(response.status_code, 401)
+
+
+class DateJoinedPagination(KeysetPagination):
+    ordering = ('-date_joined',)
+    page_size = 3
+
+
+class UserListView(GenericAPIView):
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        return paginated_response(self, User.objects.all(), UserSerializer, pagination_class=DateJoinedPagination)
+
+
+class KeysetPaginationTests(TestCase):
+    def walk(self, url):
+        factory = APIRequestFactory()
+        ids = []
+        while url:
+            response = UserListView.as_view()(factory.get(url))
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [user['id'] for user in response.data['results']]
+            self.assertLessEqual(len(ids), User.objects.count(), 'Pages repeat')
+            url = response.data['next']
+        return ids
+
+    def test_pages(self):
+        now = timezone.now().replace(microsecond=0)
+        for index in range(10):
+            User.objects.create(email=f'user{index}@example.com', date_joined=now - timedelta(minutes=index % 4))
+        expected = list(User.objects.order_by('-date_joined', 'pk').values_list('pk', flat=True))
+        self.assertEqual(self.walk('/users/'), expected)
+
+    def test_rows_of_the_same_millisecond(self):
+        now = timezone.now().replace(microsecond=500000)
+        for index in range(8):
+            User.objects.create(email=f'user{index}@example.com', date_joined=now + timedelta(microseconds=index * 100))
+        expected = list(User.objects.order_by('-date_joined', 'pk').values_list('pk', flat=True))
+        self.assertEqual(self.walk('/users/'), expected)
+
+    def test_invalid_cursor(self):
+        response = UserListView.as_view()(APIRequestFactory().get('/users/?cursor=invalid'))
+        self.assertEqual(response.status_code, 404)
+
+
+class SharedKeyThrottle(FixedWindowRateThrottle):
+    rate = '5/min'
+
+    def get_cache_key(self, request, view):
+        return 'throttle_test'
+
+    def timer(self):
+        # Mid-window, so that every request counts in the same one
+        return 30.0
+
+
+class FixedWindowRateThrottleTests(TestCase):
+    def admitted(self, threads=20):
+        barrier = threading.Barrier(threads)
+        results = []
+
+        def hit():
+            throttle = SharedKeyThrottle()
+            barrier.wait()
+            results.append(throttle.allow_request(None, None))
+
+        workers = [threading.Thread(target=hit) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results.count(True)
+
+    def test_concurrent_requests_atomic_incr(self):
+        clear_caches()
+        self.assertEqual(self.admitted(), 5)
+
+    def test_concurrent_requests_slots(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+            with override_settings(CACHES={**settings.CACHES, 'throttles': backend}):
+                self.assertEqual(self.admitted(), 5)
+
+
+class AuthQueryPlanTests(TestCase):
+    def test_email_lookup_uses_lower_email_index(self):
+        plan = auth_query_plans()['user_by_email']
+        self.assertTrue(plan['uses_index'], plan['plan'])
+        self.assertIn('accounts_user_email_ci_unique', plan['plan'])
+
+    def test_auth_queries_use_indexes(self):
+        for name, plan in auth_query_plans().items():
+            with self.subTest(name):
+                self.assertIsNot(plan['uses_index'], False, plan['plan'])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class DatabaseRoutingTests(TransactionTestCase):
+    """
+    replica_1 mirrors the test database, without a transaction around each test so that it sees the rows.
+    """
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        self.user = User.objects.create(email='routing@example.com')
+        self.factory = RequestFactory()
+
+    def queries(self):
+        return CaptureQueriesContext(connections['default']), CaptureQueriesContext(connections['replica_1'])
+
+    def test_reads_go_to_the_replica(self):
+        token = db.start_routing(self.factory.get('/'))
+        try:
+            primary, replica = self.queries()
+            with primary, replica:
+                self.assertEqual(list(User.objects.all()), [self.user])
+            self.assertEqual((len(primary), len(replica)), (0, 1))
+        finally:
+            db.stop_routing(token)
+
+    def test_writes_pin_the_primary(self):
+        token = db.start_routing(self.factory.get('/'))
+        try:
+            self.assertEqual(User.objects.all().db, 'replica_1')
+            User.objects.create(email='other@example.com')
+            self.assertEqual(User.objects.all().db, 'default')
+        finally:
+            db.stop_routing(token)
+
+    def test_transactions_and_unsafe_methods_use_the_primary(self):
+        token = db.start_routing(self.factory.get('/'))
+        try:
+            with transaction.atomic():
+                self.assertEqual(User.objects.all().db, 'default')
+        finally:
+            db.stop_routing(token)
+
+        token = db.start_routing(self.factory.post('/'))
+        try:
+            self.assertEqual(User.objects.all().db, 'default')
+        finally:
+            db.stop_routing(token)
+
+    def test_outside_requests(self):
+        self.assertEqual(User.objects.all().db, 'default')
+
+    def test_middleware_pins_reads_after_a_write(self):
+        databases = []
+
+        def view(request):
+            databases.append(User.objects.all().db)
+            User.objects.filter(pk=self.user.pk).update(first_name='Routing')
+            with CaptureQueriesContext(connections['default']) as primary:
+                self.assertEqual(User.objects.get(pk=self.user.pk).first_name, 'Routing')
+            databases.append('default' if primary else 'replica_1')
+            return HttpResponse()
+
+        DatabaseRoutingMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(databases, ['replica_1', 'default'])
+        self.assertIsNone(db.current_routing.get())
+
+
+class LazyAdminTests(TestCase):
+    def test_admin_imported_on_first_admin_request(self):
+        script = (
+            'import sys, django; django.setup(); from django.urls import resolve; '
+            'resolve("/api/auth/account/"); loaded = "apps.accounts.admin" in sys.modules; '
+            'resolve("/administration/login/"); print(loaded, "apps.accounts.admin" in sys.modules)'
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), ['False', 'True'])
+
+    def test_admin_login(self):
+        self.assertEqual(self.client.get('/administration/login/').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StatelessAuthenticationTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='stateless@example.com', password='password-123', first_name='A')
+
+    def get_account(self, access):
+        return self.client.get('/api/auth/account/', headers={'Authorization': f'Bearer {access}'})
+
+    @override_settings(ACCOUNTS={**settings.ACCOUNTS, 'STATELESS_AUTHENTICATION': True, 'USER_CACHE_ENABLED': False})
+    def test_account_without_user_query(self):
+        data = login(self.client, 'stateless@example.com', 'password-123').json()
+        with self.assertNumQueries(0):
+            response = self.get_account(data['access'])
+        self.assertEqual(response.json(), data['data'])
+
+    @override_settings(ACCOUNTS={**settings.ACCOUNTS, 'STATELESS_AUTHENTICATION': True})
+    def test_write_loads_the_user(self):
+        access = login(self.client, 'stateless@example.com', 'password-123').json()['access']
+        response = self.client.post('/api/auth/change-password/', {
+            'oldPassword': 'password-123', 'newPassword': 'password-456', 'newPasswordConfirmation': 'password-456',
+        }, content_type='application/json', headers={'Authorization': f'Bearer {access}'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('password-456'))
+
+    def test_snapshot_ignored_when_disabled(self):
+        access = login(self.client, 'stateless@example.com', 'password-123').json()['access']
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        clear_caches()
+        self.assertEqual(self.get_account(access).status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='cached@example.com', password='password-123', first_name='A')
+        self.access = login(self.client, 'cached@example.com', 'password-123').json()['access']
+
+    def get_account(self):
+        return self.client.get('/api/auth/account/', headers={'Authorization': f'Bearer {self.access}'})
+
+    def test_cached_user(self):
+        self.get_account()
+        with self.assertNumQueries(0):
+            response = self.get_account()
+        self.assertEqual(response.json()['firstName'], 'A')
+
+    def test_refresh_without_user_query(self):
+        refresh = login(self.client, 'cached@example.com', 'password-123').json()['refresh']
+        self.get_account()
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse([query['sql'] for query in queries if User._meta.db_table in query['sql']])
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post('/api/auth/token/refresh/', {
+            'refresh': response.json()['refresh'],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalidated_on_save(self):
+        self.get_account()
+        self.user.first_name = 'B'
+        self.user.save()
+        self.assertEqual(self.get_account().json()['firstName'], 'B')
+
+    def test_invalidated_on_delete(self):
+        self.get_account()
+        self.user.delete()
+        self.assertEqual(self.get_account().status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        User.objects.create_user(email='tokens@example.com', password='password-123')
+        self.refresh = login(self.client, 'tokens@example.com', 'password-123').json()['refresh']
+
+    def post(self, path, refresh):
+        response = self.client.post(path, {'refresh': refresh}, content_type='application/json')
+        self.client.cookies.clear()
+        return response
+
+    def test_rotation_and_logout(self):
+        response = self.post('/api/auth/token/refresh/', self.refresh)
+        self.assertEqual(response.status_code, 200, response.content)
+        rotated = response.json()['refresh']
+        self.assertEqual(self.post('/api/auth/token/refresh/', self.refresh).status_code, 401)
+
+        self.assertEqual(self.post('/api/auth/logout/', rotated).status_code, 200)
+        self.assertEqual(self.post('/api/auth/token/refresh/', rotated).status_code, 401)
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_revocations_answered_from_the_cache(self):
+        token = RefreshToken(self.refresh)
+        token.blacklist()
+        with self.assertNumQueries(0):
+            self.assertTrue(token_blacklist.is_revoked(token['jti'], token['exp']))
+
+    def test_revocations_saved_through_the_model(self):
+        token = RefreshToken(self.refresh)
+        # As with a cache shared by every worker, where "not revoked" answers are trusted
+        with mock.patch.object(type(token_blacklist), 'shares_negatives', mock.PropertyMock(return_value=True)):
+            self.assertFalse(token_blacklist.is_revoked(token['jti'], token['exp']))
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+            token_blacklist.revoked.clear()
+            self.assertTrue(token_blacklist.is_revoked(token['jti'], token['exp']))
+        self.assertEqual(self.post('/api/auth/token/refresh/', self.refresh).status_code, 401)
+
+    def test_outstanding_answers_expire(self):
+        token = RefreshToken(self.refresh)
+        cache = caches[settings.ACCOUNTS['TOKEN_BLACKLIST_ALIAS']]
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            token_blacklist.is_revoked(token['jti'], token['exp'])
+        self.assertEqual(add.call_args.args[2], settings.ACCOUNTS['TOKEN_BLACKLIST_OUTSTANDING_TIMEOUT'])
+
+    @override_settings(ACCOUNTS={**settings.ACCOUNTS, 'OUTSTANDING_TOKEN_BATCH_SIZE': 50})
+    def test_batched_outstanding_tokens(self):
+        outstanding_tokens.flush()
+        count = OutstandingToken.objects.count()
+        rotated = self.post('/api/auth/token/refresh/', self.refresh).json()['refresh']
+        self.assertEqual((len(outstanding_tokens), OutstandingToken.objects.count()), (1, count))
+        outstanding_tokens.flush()
+        self.assertTrue(OutstandingToken.objects.filter(jti=RefreshToken(rotated)['jti']).exists())
+
+
+class PruneTokensTests(TestCase):
+    def setUp(self):
+        expired = timezone.now() - timedelta(days=1)
+        valid = timezone.now() + timedelta(days=1)
+        for index in range(25):
+            token = OutstandingToken.objects.create(
+                jti=f'jti{index}', token='token', expires_at=valid if index % 5 == 0 else expired,
+            )
+            if index % 2:
+                BlacklistedToken.objects.create(token=token)
+
+    def test_dry_run(self):
+        result = prune_expired_tokens(batch_size=7, dry_run=True)
+        self.assertEqual(result, {'batches': 3, 'outstanding_deleted': 20, 'blacklisted_deleted': 10})
+        self.assertEqual(OutstandingToken.objects.count(), 25)
+
+    def test_max_batches(self):
+        self.assertEqual(prune_expired_tokens(batch_size=7, max_batches=2)['outstanding_deleted'], 14)
+        self.assertEqual(OutstandingToken.objects.count(), 11)
+
+    def test_prune(self):
+        prune_expired_tokens(batch_size=7)
+        self.assertEqual(OutstandingToken.objects.filter(expires_at__lt=timezone.now()).count(), 0)
+        self.assertEqual((OutstandingToken.objects.count(), BlacklistedToken.objects.count()), (5, 2))
+        self.assertEqual(token_tables_report()[OutstandingToken._meta.db_table]['expired_rows'], 0)
+
+
+@override_settings(MAIL_QUEUE={'BATCH_SIZE': 5, 'RETRY_BACKOFF': 0.01})
+class ThreadMailQueueTests(TestCase):
+    def setUp(self):
+        self.queue = ThreadMailQueue()
+
+    def enqueue(self, count):
+        for index in range(count):
+            self.queue.enqueue(EmailMessage(f'Message {index}', 'Body', to=['user@example.com']))
+        self.assertTrue(self.queue.flush(timeout=5))
+
+    def test_batches_share_a_connection(self):
+        with mock.patch('utils.mail.get_connection', wraps=get_connection) as connect:
+            self.enqueue(12)
+        self.assertEqual(len(mail.outbox), 12)
+        self.assertLess(connect.call_count, 12)
+
+    def test_retry(self):
+        with mock.patch.object(EmailMessage, 'send', side_effect=[OSError, OSError, 1], autospec=True) as send:
+            with self.assertLogs('utils.mail', 'WARNING'):
+                self.enqueue(1)
+        self.assertEqual(send.call_count, 3)
+
+    def test_give_up_after_max_retries(self):
+        with mock.patch.object(EmailMessage, 'send', side_effect=OSError, autospec=True) as send:
+            with self.assertLogs('utils.mail', 'ERROR'):
+                self.enqueue(1)
+        self.assertEqual(send.call_count, 3)
+
+
+class EmailTemplateTests(TestCase):
+    template_name = 'auth/password_reset_email.html'
+
+    def test_render_matches_template(self):
+        html = render_to_string(self.template_name, {'verification_code': '123456'})
+        template = EmailTemplate(self.template_name, placeholders={'verification_code': 6})
+        self.assertEqual(template.render(verification_code='123456'), (html, htmltotext(html)))
+
+    def test_rendered_once_per_language(self):
+        template = EmailTemplate(self.template_name, placeholders={'verification_code': 6})
+        with mock.patch('utils.mail.render_to_string', wraps=render_to_string) as render:
+            for language in ('fr', 'fr', 'en', 'en'):
+                with translation.override(language):
+                    html, _text = template.render(verification_code='654321')
+                self.assertIn('654321', html)
+        self.assertEqual(render.call_count, 2)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, ACCOUNTS={'PASSWORD_HASHING_MAX_WORKERS': 1, 'PASSWORD_HASHING_QUEUE_SIZE': 0})
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='hashing@example.com', password='password-1')
+        self.executor = PasswordHashingExecutor()
+        patcher = mock.patch('apps.accounts.hashing.password_hashing', self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_saturated_pool_answers_503(self):
+        release = threading.Event()
+        busy = self.executor.submit(release.wait)
+        # The exception handler reports 5xx errors, which the test client would re-raise
+        self.client.raise_request_exception = False
+        try:
+            response = login(self.client, 'hashing@example.com', 'password-1')
+        finally:
+            release.set()
+            busy.result()
+        self.assertEqual(response.status_code, 503, response.content)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.executor.rejected, 1)
+        self.assertEqual(login(self.client, 'hashing@example.com', 'password-1').status_code, 200)
+
+    def test_map_waits_instead_of_rejecting(self):
+        results = self.executor.map(hashers.make_password, [f'password-{index}' for index in range(10)])
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(hashers.check_password(f'password-{index}', encoded) for index, encoded in enumerate(results)))
+        self.assertEqual(self.executor.rejected, 0)
+
+    def test_check_password_hashes_once(self):
+        with mock.patch.object(hashers, 'verify_password', wraps=hashers.verify_password) as verify_password:
+            self.assertTrue(self.user.check_password('password-1'))
+            self.assertTrue(self.user.check_password('password-1'))
+            self.assertFalse(self.user.check_password('password-2'))
+        self.assertEqual(verify_password.call_count, 2)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BenchAuthTests(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, percent) for percent in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertIsNone(percentile([], 50))
+
+    def test_auth_flow(self):
+        clear_caches()
+        User.objects.create_user(email='bench@example.com', password='bench-password')
+        state = {'email': 'bench@example.com', 'password': 'bench-password'}
+        samples = {name: [] for name in ENDPOINTS}
+        with connections['default'].execute_wrapper(count_queries):
+            for _ in range(2):
+                AuthFlow(samples).run(self.client, state)
+
+        options = {'use_async': False, 'users': 1, 'iterations': 2, 'concurrency': 1, 'fast_hashing': True}
+        report = BenchAuthCommand().build_report(samples, 1, options)
+        self.assertEqual(report['total']['requests'], 2 * len(ENDPOINTS))
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(state['password'], 'bench-password')
+        self.assertGreater(report['endpoints']['login']['queries_per_request'], 0)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        registry.clear()
+        User.objects.create_user(email='metrics@example.com', password='password-1')
+
+    def test_server_timing_and_registry(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = login(self.client, 'metrics@example.com', 'password-1')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        totals = registry.snapshot()['accounts:token_obtain_pair']
+        self.assertEqual(totals['latency_ms']['count'], 1)
+        self.assertEqual(totals['totals']['db_queries'], len(queries))
+
+    def test_budget(self):
+        budgets = {'accounts:token_obtain_pair': {'db_queries': 1}}
+        with override_settings(INSTRUMENTATION={'BUDGETS': budgets, 'BUDGET_ACTION': 'raise'}):
+            with self.assertRaisesMessage(BudgetExceeded, 'accounts:token_obtain_pair exceeded its budget: db_queries='):
+                login(self.client, 'metrics@example.com', 'password-1')
+        with override_settings(INSTRUMENTATION={'BUDGETS': budgets}):
+            with self.assertLogs('utils.instrumentation', 'WARNING'):
+                self.assertEqual(login(self.client, 'metrics@example.com', 'password-1').status_code, 200)
+
+    def test_histogram(self):
+        histogram = Histogram((5, 10))
+        for value in (1, 5, 7, 20):
+            histogram.observe(value)
+        self.assertEqual(histogram.as_dict(), {'buckets': {'5': 2, '10': 1, '+Inf': 1}, 'count': 4, 'sum': 33})
+
+
+class CamelCaseTests(TestCase):
+    documents = [
+        {'first_name': 'Zoé', 'date_joined': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc)},
+        [{'user_id': uuid.UUID(int=1), 'birth_date': date(2000, 1, 1), 'balance': Decimal('1.10')}],
+        {'nested_list': [{'is_active': True, 'last_login': None}], 'line\u2028separator': 'a\u2029b'},
+        {'big_int': 2 ** 70, 'small_float': 1e-7, 'large_float': 1e20, 'float_value': 0.1},
+        {1: 'number_key', gettext_lazy('lazy_key'): 'value'},
+        None,
+    ]
+
+    def test_renderer_matches_upstream(self):
+        for data in self.documents:
+            with self.subTest(data=data):
+                self.assertEqual(CamelCaseJSONRenderer().render(data), UpstreamCamelCaseJSONRenderer().render(data))
+
+    def test_parser_matches_upstream(self):
+        contents = [
+            b'{"firstName": "Zo\\u00e9", "dateJoined": "2024-01-02", "nestedList": [{"isActive": true}]}',
+            b'[{"userId": 1, "bigInt": 123456789012345678901234567890, "value2": 1.5}]',
+            b'{"notANumber": NaN}',
+        ]
+        for content in contents:
+            with self.subTest(content=content):
+                self.assertEqual(
+                    CamelCaseJSONParser().parse(BytesIO(content)), UpstreamCamelCaseJSONParser().parse(BytesIO(content)),
+                )
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, ACCOUNTS={'EXPORT_CHUNK_SIZE': 3})
+class UserExportTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='password-1')
+        for index in range(7):
+            User.objects.create(email=f'export{index}@example.com', first_name=f'Zoé "{index}",')
+        self.client.force_login(self.admin)
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/users/export{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="users-', response['Content-Disposition'])
+        return b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        expected = [
+            json.loads(CamelCaseJSONRenderer().render(UserSerializer(user).data)) for user in User.objects.order_by('pk')
+        ]
+        self.assertEqual([json.loads(line) for line in self.export().splitlines()], expected)
+
+    def test_csv(self):
+        rows = list(csv.reader(StringIO(self.export('?exportFormat=csv').decode())))
+        self.assertEqual(rows[0][:3], ['id', 'lastLogin', 'firstName'])
+        self.assertEqual([row[2] for row in rows[2:]], [f'Zoé "{index}",' for index in range(7)])
+
+    def test_invalid_format_and_permission(self):
+        self.assertEqual(self.client.get('/api/users/export?exportFormat=xml').status_code, 400)
+        self.client.force_login(User.objects.get(email='export0@example.com'))
+        self.assertEqual(self.client.get('/api/users/export').status_code, 403)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UserImportTests(TestCase):
+    def test_import_users(self):
+        User.objects.create(email='taken@example.com')
+        rows = [
+            {'email': 'first@EXAMPLE.COM', 'password': 'password-1', 'first_name': 'First'},
+            {'email': 'invalid', 'password': 'password-1'},
+            {'email': 'TAKEN@example.com', 'password': 'password-1'},
+            {'email': 'first@example.com', 'password': 'password-1'},
+            'not a dict',
+            {'email': 'second@example.com', 'password': 'password-2'},
+        ]
+        result = import_users(rows, batch_size=2)
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([error['index'] for error in result['errors']], [1, 2, 3, 4])
+        self.assertTrue(User.objects.get(email='first@example.com').check_password('password-1'))
+        self.assertTrue(User.objects.get(email='second@example.com').check_password('password-2'))
+
+    @override_settings(ACCOUNTS={'IMPORT_MAX_ROWS': 2})
+    def test_api(self):
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='password-1'))
+        # Passwords are hashed on the pool of the process, no hashing process is started
+        with mock.patch('apps.accounts.hashing.ProcessPoolExecutor') as process_pool:
+            response = self.client.post('/api/users/import', {
+                'users': [{'email': 'new@example.com', 'password': 'password-1', 'firstName': 'New'}, {}],
+            }, content_type='application/json')
+        process_pool.assert_not_called()
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+        self.assertEqual(User.objects.get(email='new@example.com').first_name, 'New')
+
+        response = self.client.post('/api/users/import', {'users': [{}, {}, {}]}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            file.write('email,password,firstName\ncommand@example.com,password-1,Command\ninvalid,password-1,Invalid\n')
+            file.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_users', file.name, '--workers', '0', stdout=stdout, stderr=stderr)
+        self.assertIn('Created 1 users, rejected 1', stdout.getvalue())
+        self.assertEqual(json.loads(stderr.getvalue())[0]['index'], 1)
+        self.assertEqual(User.objects.get(email='command@example.com').first_name, 'Command')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginGuardTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        User.objects.create_user(email='guard@example.com', password='password-1')
+
+    def login(self, password, email='guard@example.com', ip='192.0.2.1', **headers):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': password},
+                                content_type='application/json', REMOTE_ADDR=ip, **headers)
+
+    def test_account_lockout(self):
+        for _ in range(5):
+            self.assertEqual(self.login('wrong-password').status_code, 401)
+        with mock.patch.object(hashers, 'verify_password') as verify_password:
+            response = self.login('password-1')
+        verify_password.assert_not_called()
+        self.assertEqual(response.status_code, 429, response.content)
+        self.assertEqual(response.json()['errors'][0]['code'], 'login_locked')
+        self.assertEqual(response['Retry-After'], '60')
+
+        # Other accounts behind the same IP are not locked out
+        User.objects.create_user(email='other@example.com', password='password-1')
+        self.assertEqual(self.login('password-1', 'other@example.com').status_code, 200)
+
+        # Each failure after the lockout doubles the next one
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(self.login('wrong-password').status_code, 401)
+            self.assertEqual(self.login('password-1')['Retry-After'], '120')
+
+    def test_success_resets_account_failures(self):
+        for _ in range(4):
+            self.login('wrong-password')
+        self.assertEqual(self.login('password-1').status_code, 200)
+        for _ in range(4):
+            self.assertEqual(self.login('wrong-password').status_code, 401)
+
+    def test_ip_lockout(self):
+        for index in range(20):
+            self.login('wrong-password', f'unknown{index}@example.com')
+        self.assertEqual(self.login('password-1').status_code, 429)
+        self.assertEqual(self.login('password-1', ip='192.0.2.2').status_code, 200)
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        for index in range(20):
+            self.login('wrong-password', f'unknown{index}@example.com', HTTP_X_FORWARDED_FOR=f'198.51.100.{index}')
+        self.assertEqual(self.login('password-1').status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_forwarded_for_behind_proxies(self):
+        for index in range(20):
+            self.login('wrong-password', f'unknown{index}@example.com', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.1')
+        self.assertEqual(self.login('password-1', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.1').status_code, 429)
+        self.assertEqual(self.login('password-1', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.2').status_code, 200)
+
+    async def test_async_lockout(self):
+        view = AsyncTokenObtainPairView.as_view()
+
+        async def login(password):
+            return await view(AsyncRequestFactory().post('/api/auth/login/', {
+                'email': 'guard@example.com', 'password': password,
+            }, content_type='application/json'))
+
+        for _ in range(5):
+            self.assertEqual((await login('wrong-password')).status_code, 401)
+        self.assertEqual((await login('password-1')).status_code, 429)
+
+
+class CacheConfigurationTests(TestCase):
+    def test_parse_cache_url(self):
+        self.assertEqual(parse_cache_url('file:///var/cache/app/', 'users')['LOCATION'], '/var/cache/app/users')
+        self.assertEqual(parse_cache_url('db://cache_table?timeout=60'), {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_table', 'TIMEOUT': 60,
+        })
+        self.assertEqual(parse_cache_url('redis://cache:6379/1?key_prefix=app&db=2'), {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/1',
+            'KEY_PREFIX': 'app', 'OPTIONS': {'db': '2'},
+        })
+        with self.assertRaises(ValueError):
+            parse_cache_url('ftp://cache')
+
+    def test_build_caches(self):
+        config = build_caches('locmem://', {'throttles': 'db://throttle_table'}, tiered=['users'])
+        self.assertEqual(set(config), {'default', 'sessions', 'throttles', 'tokens', 'users', 'users_shared'})
+        self.assertEqual(config['throttles']['BACKEND'], 'django.core.cache.backends.db.DatabaseCache')
+        self.assertEqual(config['sessions']['KEY_PREFIX'], 'sessions')
+        self.assertEqual(config['users']['BACKEND'], 'utils.cache.TieredCache')
+        self.assertEqual(config['users_shared']['LOCATION'], 'users')
+
+
+@override_settings(CACHES=build_caches('locmem://', tiered=['users']))
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.cache = caches['users']
+        self.cache.clear()
+
+    def test_tiers(self):
+        self.assertIsInstance(self.cache, TieredCache)
+        self.assertIs(shared_backend(self.cache), caches['users_shared'])
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', 1, 60)
+        self.assertEqual(caches['users_shared'].get('key'), 1)
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get('key'), 1)
+        self.assertEqual(self.cache.get('key'), 1)
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+        self.assertTrue(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.get('counter'), 5)
+        self.assertEqual(self.cache.incr('counter'), 6)
+        self.assertEqual(self.cache.get('counter'), 6)
+
+        stats = cache_stats()['users']
+        self.assertGreaterEqual(stats['local_hits'], 1)
+        self.assertGreaterEqual(stats['shared_hits'], 1)
+        self.assertIn('hit_ratio', stats)
+
+    def test_get_or_set_keeps_the_lock_of_another_process(self):
+        self.addCleanup(setattr, self.cache, 'lock_timeout', self.cache.lock_timeout)
+        self.cache.lock_timeout = 0.1
+        caches['users_shared'].add('key:lock', True)
+        self.assertEqual(self.cache.get_or_set('key', 'value', 60), 'value')
+        self.assertTrue(caches['users_shared'].get('key:lock'))
+
+    def test_get_or_set_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_set('key', compute, 60)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(len(calls), 1)
+
+
+class ModelCreateUserSerializer(serializers.ModelSerializer):
+    class Meta(CreateUserSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+class FieldPlanTests(TestCase):
+    def test_matches_model_serializer(self):
+        users = make_users(20)
+        users[3].last_login = datetime(2020, 1, 1, 12)
+        for time_zone in ('UTC', 'Europe/Paris'):
+            with self.subTest(time_zone=time_zone), timezone.override(zoneinfo.ZoneInfo(time_zone)):
+                self.assertEqual(UserSerializer(users, many=True).data, ModelUserSerializer(users, many=True).data)
+                self.assertEqual(UserSerializer(users[3]).data, ModelUserSerializer(users[3]).data)
+                self.assertEqual(CreateUserSerializer(users[1]).data, ModelCreateUserSerializer(users[1]).data)
+        with override_settings(USE_TZ=False):
+            self.assertEqual(UserSerializer(users[4]).data, ModelUserSerializer(users[4]).data)
+
+    def test_values_rows_and_snapshot_users(self):
+        user = User.objects.create_user(email='plan@example.com', password='password-1', first_name='Plan')
+        expected = ModelUserSerializer(User.objects.all(), many=True).data
+        self.assertEqual(UserSerializer(User.objects.all(), many=True).data, expected)
+        rows = User.objects.values(*UserSerializer.value_fields())
+        self.assertEqual(UserSerializer(rows, many=True).data, expected)
+        with self.settings(ACCOUNTS={'STATELESS_AUTHENTICATION': True}):
+            snapshot = SnapshotUser(RefreshToken.for_user(user).access_token)
+            self.assertEqual(UserSerializer(snapshot).data, ModelUserSerializer(snapshot).data)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ConditionalAccountTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email='etag@example.com', password='password-1', first_name='Etag')
+        self.authorization = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+
+    def get_account(self, **headers):
+        return self.client.get('/api/auth/account/', headers={'Authorization': self.authorization, **headers})
+
+    def test_not_modified(self):
+        response = self.get_account()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.get_account(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        self.user.first_name = 'Changed'
+        self.user.save()
+        response = self.get_account(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_authentication_checked_first(self):
+        etag = self.get_account()['ETag']
+        self.assertEqual(self.client.get('/api/auth/account/', headers={'If-None-Match': etag}).status_code, 401)
+
+    async def test_async_not_modified(self):
+        etag = (await self.async_client.get('/api/auth/account/', headers={'Authorization': self.authorization}))['ETag']
+        view = AsyncAccountView.as_view()
+        request = AsyncRequestFactory().get('/', headers={'Authorization': self.authorization, 'If-None-Match': etag})
+        response = await view(request)
+        self.assertEqual(response.status_code, 304, response.content)
+        self.assertEqual(response['ETag'], etag)
+        response = await view(AsyncRequestFactory().get('/', headers={'Authorization': self.authorization}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+
+
+class PrecompressedSchemaTests(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        schema_store.clear()
+        self.addCleanup(schema_store.clear)
+
+    def test_schema(self):
+        expected = SpectacularAPIView.as_view()(RequestFactory().get('/api/schema/', HTTP_ACCEPT='application/json'))
+        expected.render()
+        with self.settings(SCHEMA_CACHE_DIR=self.directory / 'missing'):
+            response = self.client.get('/api/schema/', HTTP_ACCEPT='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(response.content, expected.content)
+
+            compressed = self.client.get('/api/schema/', HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compressed['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(compressed.content), expected.content)
+            self.assertNotEqual(compressed['ETag'], response['ETag'])
+
+            not_modified = self.client.get(
+                '/api/schema/', HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+            self.assertEqual(not_modified.status_code, 304)
+
+            yaml = self.client.get('/api/schema/')
+            self.assertIn(b'openapi:', yaml.content)
+            self.assertIn('Accept-Encoding', yaml['Vary'])
+
+    def test_generated_in_development(self):
+        # A directory built once would keep serving a stale schema
+        self.assertIsNone(settings.SCHEMA_CACHE_DIR)
+        self.assertIn(b'"openapi"', self.client.get('/api/schema/', HTTP_ACCEPT='application/json').content)
+
+    def test_build_schema(self):
+        call_command('build_schema', directory=self.directory, lang=['fr', 'en'], stdout=StringIO())
+        names = {path.name for path in self.directory.iterdir()}
+        self.assertLessEqual({'schema-1.0-fr.json', 'schema-1.0-en.yaml.gzip'}, names)
+
+        # Documents are served from the directory as they were built
+        (self.directory / 'schema-1.0-fr.json').write_bytes(b'{"built": true}')
+        (self.directory / 'schema-1.0-fr.json.gzip').unlink()
+        with self.settings(SCHEMA_CACHE_DIR=self.directory):
+            response = self.client.get('/api/schema/?lang=fr', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, b'{"built": true}')
+
+
+class WarmUpTests(TestCase):
+    # warm_up() connects to every database
+    databases = '__all__'
+
+    def test_steps(self):
+        timings = warm_up(connect=False)
+        self.assertEqual(list(timings), ['urls', 'serializers', 'templates', 'hashers'])
+        self.assertIn('_field_plan', UserSerializer.__dict__)
+        self.assertTrue(password_reset_email._variants)
+        self.assertEqual(list(warm_up(requests=True))[-2:], ['connections', 'requests'])
+
+    @override_settings(ALLOWED_HOSTS=['.example.com'], SECURE_SSL_REDIRECT=True)
+    def test_requests(self):
+        responses = []
+        get_response = BaseHandler.get_response
+
+        def record_response(handler, request):
+            response = get_response(handler, request)
+            responses.append((request.method, request.path, response.status_code))
+            return response
+
+        with mock.patch.object(BaseHandler, 'get_response', record_response):
+            send_requests(warm_resolvers())
+        self.assertIn(('OPTIONS', '/api/auth/login/', 200), responses)
+        self.assertTrue(all(method == 'OPTIONS' and path.startswith('/api/') for method, path, _ in responses))
+        self.assertTrue(all(status_code < 500 for *_, status_code in responses), responses)
+        # Throttled views would use up the rate of the server's own address
+        self.assertNotIn('/api/auth/forgot-password/', [path for _, path, _ in responses])
+
+    def test_admin_stays_lazy(self):
+        script = (
+            'import sys, django; django.setup(); from config.warmup import warm_up; '
+            'warm_up(connect=False); print("apps.accounts.admin" in sys.modules)'
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), ['False'])
@@ -1,7 +1,78 @@
+import math
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
 from rest_framework.throttling import SimpleRateThrottle
 
+from utils.cache import shared_backend
+from utils.instrumentation import instrument_cache
+from .conf import accounts_setting
+
+# Backends whose incr() is a single atomic operation, the others implement it as a get followed by a set
+ATOMIC_INCR_BACKENDS = (LocMemCache, RedisCache, BaseMemcachedCache)
+
+# The file cache's add() is a lookup followed by a write, serialize it at least within the process
+_slots_lock = threading.Lock()
+
+
+class FixedWindowRateThrottle(SimpleRateThrottle):
+    """
+    ``SimpleRateThrottle`` counting requests per fixed window of the rate's duration, instead of storing and
+    rewriting the timestamps of every request in the window.
+
+    On backends with an atomic ``incr`` (locmem, redis, memcached) each request is one ``add`` and one ``incr``
+    of the window counter. On the others (database, file) it claims one of ``num_requests`` slot keys with
+    ``add``, which the database cache makes atomic through the primary key (the file cache only within a
+    process). Subclasses only implement
+    ``get_cache_key``, like any DRF throttle, so this is reusable for login or refresh endpoints.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Counters must be read from the shared backend, not from a local tier in front of it
+        self.raw_cache = shared_backend(caches[accounts_setting('THROTTLE_CACHE_ALIAS')])
+        self.cache = instrument_cache(self.raw_cache)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
 
-class PasswordResetRateThrottle(SimpleRateThrottle):
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        if self.hit(f'{self.key}:{window}', timeout=math.ceil(self.window_end - self.now) + 1):
+            return True
+        return self.throttle_failure()
+
+    def hit(self, key, timeout):
+        """
+        Counts a request in the window stored under ``key``, returns whether it is within the rate.
+        """
+        if isinstance(self.raw_cache, ATOMIC_INCR_BACKENDS):
+            self.cache.add(key, 0, timeout)
+            try:
+                return self.cache.incr(key) <= self.num_requests
+            except ValueError:
+                # Expired between add() and incr(), this request opens the window again
+                return self.cache.add(key, 1, timeout) or self.cache.incr(key) <= self.num_requests
+
+        slots = [f'{key}:{slot}' for slot in range(self.num_requests)]
+        with _slots_lock:
+            taken = len(self.cache.get_many(slots))
+            return any(self.cache.add(slot, 1, timeout) for slot in slots[taken:])
+
+    def wait(self):
+        return self.window_end - self.now
+
+
+class PasswordResetRateThrottle(FixedWindowRateThrottle):
     scope = 'password_reset'
 
     def get_cache_key(self, request, view):
@@ -14,8 +85,11 @@ class PasswordResetRateThrottle(SimpleRateThrottle):
         }
 
 
-class PasswordResetIPThrottle(SimpleRateThrottle):
+class PasswordResetIPThrottle(FixedWindowRateThrottle):
     scope = 'password_reset_ip'
 
     def get_cache_key(self, request, view):
-        return self.get_ident(request)
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
@@ -0,0 +1,195 @@
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import outstanding_tokens, token_blacklist
+from .cache import user_cache
+from .conf import accounts_setting
+from .models import User
+
+USER_SNAPSHOT_CLAIM = 'usr'
+USER_SNAPSHOT_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login',
+)
+USER_SNAPSHOT_DATETIME_FIELDS = ('date_joined', 'last_login')
+
+
+def user_snapshot(user):
+    snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+    for field in USER_SNAPSHOT_DATETIME_FIELDS:
+        if snapshot[field] is not None:
+            snapshot[field] = snapshot[field].isoformat()
+    return snapshot
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token whose blacklist bookkeeping goes through ``token_blacklist`` and
+    ``outstanding_tokens`` instead of querying the token_blacklist tables directly.
+
+    Every method touching storage has an ``a``-prefixed counterpart for async views.
+    """
+    user = None
+
+    def __init__(self, token=None, verify=True, check_blacklist=True):
+        self._check_blacklist_on_verify = check_blacklist
+        super().__init__(token, verify)
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user, the outstanding row is written by outstand()
+        token = super(tokens.BlacklistMixin, cls).for_user(user)
+        token.user = user
+        token.outstand()
+        return token
+
+    @classmethod
+    async def afor_user(cls, user):
+        token = super(tokens.BlacklistMixin, cls).for_user(user)
+        token.user = user
+        await token.aoutstand()
+        return token
+
+    @classmethod
+    async def averified(cls, token):
+        """
+        Decodes and verifies ``token``, checking the blacklist asynchronously.
+        """
+        token = cls(token, check_blacklist=False)
+        await token.acheck_blacklist()
+        return token
+
+    def verify(self, *args, **kwargs):
+        if self._check_blacklist_on_verify:
+            self.check_blacklist()
+        super(tokens.BlacklistMixin, self).verify(*args, **kwargs)
+
+    def _outstanding_token(self):
+        user_id = self.user.pk if self.user is not None else self.get(api_settings.USER_ID_CLAIM)
+        return OutstandingToken(
+            user_id=user_id,
+            jti=self[api_settings.JTI_CLAIM],
+            token=str(self),
+            created_at=self.current_time,
+            expires_at=datetime_from_epoch(self['exp']),
+        )
+
+    def _outstanding_token_defaults(self):
+        outstanding_token = self._outstanding_token()
+        return {
+            'user_id': outstanding_token.user_id,
+            'created_at': outstanding_token.created_at,
+            'token': outstanding_token.token,
+            'expires_at': outstanding_token.expires_at,
+        }
+
+    def check_blacklist(self):
+        if token_blacklist.is_revoked(self[api_settings.JTI_CLAIM], self['exp']):
+            raise TokenError(_("Token is blacklisted"))
+
+    async def acheck_blacklist(self):
+        if await token_blacklist.ais_revoked(self[api_settings.JTI_CLAIM], self['exp']):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        outstanding_token = self._outstanding_token()
+        outstanding_tokens.add(outstanding_token)
+        token_blacklist.mark_outstanding(outstanding_token.jti, self['exp'])
+        return outstanding_token
+
+    async def aoutstand(self):
+        outstanding_token = self._outstanding_token()
+        await outstanding_tokens.aadd(outstanding_token)
+        await token_blacklist.amark_outstanding(outstanding_token.jti, self['exp'])
+        return outstanding_token
+
+    def blacklist(self):
+        jti = self[api_settings.JTI_CLAIM]
+        token, _created = OutstandingToken.objects.get_or_create(jti=jti, defaults=self._outstanding_token_defaults())
+        result = BlacklistedToken.objects.get_or_create(token=token)
+        token_blacklist.mark_revoked(jti, self['exp'])
+        return result
+
+    async def ablacklist(self):
+        jti = self[api_settings.JTI_CLAIM]
+        token, _created = await OutstandingToken.objects.aget_or_create(
+            jti=jti, defaults=self._outstanding_token_defaults(),
+        )
+        result = await BlacklistedToken.objects.aget_or_create(token=token)
+        await token_blacklist.amark_revoked(jti, self['exp'])
+        return result
+
+    def get_user(self):
+        if self.user is None:
+            self.user = user_cache.get(self[api_settings.USER_ID_CLAIM])
+        return self.user
+
+    async def aget_user(self):
+        if self.user is None:
+            self.user = await user_cache.aget(self[api_settings.USER_ID_CLAIM])
+        return self.user
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        if accounts_setting('STATELESS_AUTHENTICATION'):
+            access[USER_SNAPSHOT_CLAIM] = user_snapshot(self.get_user())
+        return access
+
+
+class SnapshotUser:
+    """
+    Stand-in for ``request.user`` built from the user snapshot of an access token.
+
+    Snapshot fields are answered from the token; any other attribute loads the ``User`` row
+    once and is delegated to it, so writes such as ``set_password``/``save`` keep working.
+    """
+    is_anonymous = False
+    is_authenticated = True
+
+    _meta = User._meta
+    get_full_name = User.get_full_name
+    get_short_name = User.get_short_name
+    get_username = User.get_username
+    __str__ = User.__str__
+
+    def __init__(self, token):
+        snapshot = dict(token[USER_SNAPSHOT_CLAIM])
+        for field in USER_SNAPSHOT_DATETIME_FIELDS:
+            if snapshot.get(field) is not None:
+                snapshot[field] = parse_datetime(snapshot[field])
+        object.__setattr__(self, '_snapshot', snapshot)
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def __class__(self):
+        return User
+
+    @property
+    def pk(self):
+        return self._snapshot['id']
+
+    def _get_user(self):
+        if self._user is None:
+            object.__setattr__(self, '_user', user_cache.get(self.pk))
+        return self._user
+
+    def __getattr__(self, name):
+        if name in self._snapshot:
+            return self._snapshot[name]
+        return getattr(self._get_user(), name)
+
+    def __setattr__(self, name, value):
+        if name in self._snapshot:
+            self._snapshot[name] = value
+        setattr(self._get_user(), name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, User) and self.pk == other.pk
+
+    def __hash__(self):
+        return hash(self.pk)
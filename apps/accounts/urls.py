@@ -1,10 +1,18 @@
 from django.urls import path, include
 
 from config.router import AppRouter
+from apps.accounts.conf import accounts_setting
 from apps.accounts.views import PasswordResetView, PasswordResetConfirmView, TokenObtainPairView, \
-    TokenRefreshView, LogoutView, AccountView, ChangePasswordView, RegisterView
+    TokenRefreshView, LogoutView, AccountView, ChangePasswordView, RegisterView, UserExportViewSet, \
+    UserImportView
+
+if accounts_setting('ASYNC_VIEWS'):
+    from apps.accounts.async_views import AsyncPasswordResetView as PasswordResetView, \
+        AsyncTokenObtainPairView as TokenObtainPairView, AsyncTokenRefreshView as TokenRefreshView, \
+        AsyncLogoutView as LogoutView, AsyncAccountView as AccountView
 
 router = AppRouter()
+router.register('users/export', UserExportViewSet, basename='user_export')
 
 urlpatterns = [
     path('auth/', include([
@@ -17,4 +25,6 @@ urlpatterns = [
         path('account/', AccountView.as_view(), name='account'),
         path('logout/', LogoutView.as_view(), name='logout'),
     ]), name='auth'),
+    path('users/import', UserImportView.as_view(), name='user_import'),
+    path('', include(router.urls)),
 ]
@@ -1,17 +1,29 @@
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
 from rest_framework_simplejwt import views as jwt_views
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from utils.conditional import ConditionalGetMixin, make_etag
+from .conf import accounts_setting
+from .exports import FORMATS, export_chunks
+from .hashing import password_hashing
+from .imports import import_users
+from .login_guard import get_login_attempt, login_guard
+from .models import User
 from .serializers import CreateUserSerializer, UserTokensSerializer, UserRefreshTokenSerializer
 from .serializers import PasswordResetConfirmSerializer, PasswordResetSerializer, PasswordChangeSerializer, \
-    UserSerializer
+    UserSerializer, UserExportQuerySerializer, UserImportSerializer, UserImportReportSerializer
 from .throttles import PasswordResetRateThrottle, PasswordResetIPThrottle
+from .tokens import RefreshToken
 
 
 @extend_schema(
@@ -31,10 +43,13 @@ class ChangePasswordView(GenericAPIView):
 @extend_schema(
     tags=["Authentification"],
 )
-class AccountView(GenericAPIView):
+class AccountView(ConditionalGetMixin, GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserSerializer
 
+    def get_etag(self, request):
+        return user_etag(request.user, request.accepted_renderer.format)
+
     def get(self, request, *args, **kwargs):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -64,29 +79,49 @@ class PasswordResetConfirmView(GenericAPIView):
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def user_etag(user, *parts):
+    """
+    ETag of the ``UserSerializer`` representation of ``user``, from the columns it shows. Authentication
+    already loaded them, from the user cache or the access token, so polling clients are answered without
+    touching the database.
+    """
+    return make_etag(*parts, *(getattr(user, source) for source in UserSerializer.value_fields()))
+
+
+def set_token_cookies(response, data):
+    response.set_cookie(
+        key='access_token',
+        value=data['access'],
+        samesite='Lax',
+        httponly=not settings.DEBUG,
+        secure=not settings.DEBUG,
+        max_age=settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds(),
+    )
+    if 'refresh' in data:
+        response.set_cookie(
+            key='refresh_token',
+            value=data['refresh'],
+            samesite='Lax',
+            httponly=not settings.DEBUG,
+            secure=not settings.DEBUG,
+            max_age=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds(),
+        )
+
+
+def delete_token_cookies(response):
+    response.delete_cookie('access_token')
+    response.delete_cookie('refresh_token')
+
+
 class SetTokensInCookieMixin(GenericAPIView):
     def finalize_response(self, request, response, *args, **kwargs):
-        if response.status_code == status.HTTP_200_OK:
-            response.set_cookie(
-                key='access_token',
-                value=response.data['access'],
-                samesite='Lax',
-                httponly=not settings.DEBUG,
-                secure=not settings.DEBUG,
-                max_age=settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds(),
-            )
-            if 'refresh' in response.data:
-                response.set_cookie(
-                    key='refresh_token',
-                    value=response.data['refresh'],
-                    samesite='Lax',
-                    httponly=not settings.DEBUG,
-                    secure=not settings.DEBUG,
-                    max_age=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds(),
-                )
+        # OPTIONS is answered with 200 too, without tokens
+        if response.status_code == status.HTTP_200_OK and 'access' in response.data:
+            set_token_cookies(response, response.data)
         return super().finalize_response(request, response, *args, **kwargs)
 
 
@@ -111,7 +146,18 @@ class UserTokensInCookieMixin(GenericAPIView):
     responses=UserTokensSerializer
 )
 class TokenObtainPairView(SetTokensInCookieMixin, jwt_views.TokenObtainPairView):
-    pass
+
+    def post(self, request, *args, **kwargs):
+        email, ip = get_login_attempt(request, User.USERNAME_FIELD)
+        # Locked out attempts are rejected before the serializer runs a password hasher
+        login_guard.check(email, ip)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            login_guard.failed(email, ip)
+            raise
+        login_guard.succeeded(email)
+        return response
 
 
 @extend_schema(
@@ -128,8 +174,7 @@ class LogoutView(UserTokensInCookieMixin, jwt_views.TokenBlacklistView):
 
     def finalize_response(self, request, response, *args, **kwargs):
         if response.status_code == status.HTTP_200_OK:
-            response.delete_cookie('access_token')
-            response.delete_cookie('refresh_token')
+            delete_token_cookies(response)
         return super().finalize_response(request, response, *args, **kwargs)
 
 
@@ -151,3 +196,53 @@ class RegisterView(GenericAPIView):
             'data': serializer.data
         }
         return Response(data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=["Utilisateurs"],
+    parameters=[UserExportQuerySerializer],
+    responses={
+        (200, 'application/x-ndjson'): OpenApiResponse(OpenApiTypes.STR),
+        (200, 'text/csv'): OpenApiResponse(OpenApiTypes.STR),
+    },
+    description=_('Exporte tous les utilisateurs en flux, une ligne JSON (NDJSON) ou CSV par utilisateur.'),
+)
+class UserExportViewSet(GenericViewSet):
+    permission_classes = [IsAdminUser]
+    serializer_class = UserSerializer
+    pagination_class = None
+    queryset = User.objects.order_by('pk')
+
+    def list(self, request, *args, **kwargs):
+        query = UserExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        export_format = query.validated_data['export_format']
+
+        media_type, extension = FORMATS[export_format]
+        chunks = export_chunks(
+            export_format,
+            self.filter_queryset(self.get_queryset()),
+            self.get_serializer(),
+            accounts_setting('EXPORT_CHUNK_SIZE'),
+        )
+        response = StreamingHttpResponse(chunks, content_type=media_type)
+        filename = f'users-{timezone.now():%Y%m%d-%H%M%S}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@extend_schema(
+    tags=["Utilisateurs"],
+    responses=UserImportReportSerializer,
+    description=_('Crée des utilisateurs en masse, les lignes invalides sont ignorées et rapportées par position.'),
+)
+class UserImportView(GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = UserImportSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Hashed on the bounded pool of the process, starting hashing processes is left to the import_users command
+        result = import_users(serializer.validated_data['users'], executor=password_hashing)
+        return Response(UserImportReportSerializer(result).data, status=status.HTTP_200_OK)
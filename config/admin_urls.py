@@ -0,0 +1,9 @@
+from django.contrib import admin
+from django.urls import path
+
+# With SimpleAdminConfig the admin modules of the apps are only discovered once config.urls imports this module
+admin.autodiscover()
+
+urlpatterns = [
+    path('', admin.site.urls),
+]
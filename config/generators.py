@@ -0,0 +1,10 @@
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+
+# Registers the extensions, which drf-spectacular only needs once it generates a schema
+import apps.accounts.spectacular_extensions  # noqa: F401
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """
+    ``DEFAULT_GENERATOR_CLASS``, importing this module is what registers the project's OpenAPI extensions.
+    """
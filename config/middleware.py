@@ -0,0 +1,124 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case.util import underscoreize
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from utils import db, instrumentation
+
+
+class CamelCaseMiddleware:
+    """
+    Sync and async capable ``djangorestframework_camel_case.middleware.CamelCaseMiddleWare``, so that
+    async views served under ASGI are not pushed back into a thread by a sync-only middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.GET = underscoreize(request.GET, **camel_case_settings.JSON_UNDERSCOREIZE)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.GET = underscoreize(request.GET, **camel_case_settings.JSON_UNDERSCOREIZE)
+        return await self.get_response(request)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    Async capable ``whitenoise.middleware.WhiteNoiseMiddleware``, static files are still served from a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """
+    Records query count and time, cache calls, serializer time and total latency per URL name, see
+    ``utils.instrumentation``. Keep it first in ``MIDDLEWARE`` so the total covers the other middlewares.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not instrumentation.instrumentation_setting('ENABLED'):
+            raise MiddlewareNotUsed()
+        instrumentation.install()
+
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics, token = instrumentation.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.stop(token)
+        return instrumentation.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = instrumentation.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.stop(token)
+        return instrumentation.finish(request, response, metrics)
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Scopes the replica choice and the primary pinning of ``utils.db.PrimaryReplicaRouter`` to each request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = db.start_routing(request)
+        try:
+            return self.get_response(request)
+        finally:
+            db.stop_routing(token)
+
+    async def __acall__(self, request):
+        token = db.start_routing(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            db.stop_routing(token)
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import datetime
+import json
 from typing import TYPE_CHECKING
 
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
     from rest_framework.generics import GenericAPIView
+    from rest_framework.pagination import BasePagination
     from rest_framework.serializers import Serializer
 
 
@@ -19,7 +31,167 @@ class PageNumberAndSizePagination(PageNumberPagination):
     max_page_size_query_param = 'max_page_size'
 
 
-def paginated_response(view: GenericAPIView, queryset: QuerySet, serializer: type[Serializer], context=None):
+def estimate_count(queryset: QuerySet, threshold=10000):
+    """
+    Row count of ``queryset`` from the PostgreSQL planner, or an exact ``COUNT(*)`` on other databases and
+    below ``threshold`` rows, where the estimate is the least accurate and counting is cheap anyway.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    return queryset.count() if estimate < threshold else estimate
+
+
+def cursor_value(value):
+    """
+    JSON value of a cursor field. Datetimes and times keep their microseconds, which ``DjangoJSONEncoder``
+    drops, otherwise rows of the same millisecond could be skipped or the same page returned forever.
+    """
+    if isinstance(value, (datetime.datetime, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination with the ``PageNumberAndSizePagination`` envelope (count, next, previous, results).
+
+    Rows are ordered by ``ordering`` followed by the primary key, so the key tuple is unique, and each page
+    starts after the last row of the previous one instead of at an OFFSET, which keeps deep pages as fast as
+    the first when the tuple is indexed. Ordering fields must be concrete, non nullable model fields.
+
+    ``count`` is 'exact' (a ``COUNT(*)`` per page), 'estimate' (see ``estimate_count``) or None to omit it.
+    """
+    page_size = 20
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    ordering = ('pk',)
+    count = 'exact'
+    estimate_threshold = 10000
+    invalid_cursor_message = _('Curseur invalide.')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [self.get_field(queryset.model, name.lstrip('-')) for name in self.ordering]
+        self.total = self.get_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor is not None and cursor[1]
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, cursor[0]))
+
+        results = list(queryset[:self.page_size + 1])
+        more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, more
+        else:
+            self.has_next, self.has_previous = more, cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not {'pk', 'id', queryset.model._meta.pk.name} & {name.lstrip('-') for name in ordering}:
+            ordering += ('pk',)
+        return ordering
+
+    @staticmethod
+    def get_field(model, name):
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+    def get_count(self, queryset):
+        if self.count == 'exact':
+            return queryset.count()
+        if self.count == 'estimate':
+            return estimate_count(queryset, self.estimate_threshold)
+        return None
+
+    @staticmethod
+    def keyset_filter(ordering, values):
+        """
+        Rows after ``values`` in ``ordering``: (a > x) OR (a = x AND b > y) OR ..., with < for descending fields.
+        """
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering, values):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = cursor['v'], bool(cursor.get('r'))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)], reverse
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse=False):
+        cursor = {'v': [cursor_value(getattr(instance, field.attname)) for field in self.fields]}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, cls=DjangoJSONEncoder).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Paged back past rows deleted meanwhile, start over
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.total,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'] = {
+            'count': {'type': 'integer', 'nullable': self.count is None, 'example': 123},
+            **response_schema['properties'],
+        }
+        if self.count is not None:
+            response_schema['required'] = ['count', 'results']
+        return response_schema
+
+
+def paginated_response(view: GenericAPIView, queryset: QuerySet, serializer: type[Serializer], context=None,
+                       pagination_class: type[BasePagination] | None = None):
+    if pagination_class is not None:
+        # Replaces the paginator GenericAPIView.paginator would build from the view's pagination_class
+        view._paginator = pagination_class()
     page = view.paginate_queryset(queryset)
     context = context or view.get_serializer_context()
     if page is not None:
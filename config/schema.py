@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.views import SpectacularAPIView
+
+from utils.conditional import conditional_response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content codings the documents are precompressed with, preferred ones first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Renderer used to build the stored document of each format, the other renderers only differ by media type
+RENDERERS = {'json': OpenApiJsonRenderer, 'yaml': OpenApiYamlRenderer}
+
+
+def compress(content):
+    """
+    ``content`` in each of the ``ENCODINGS``.
+    """
+    encodings = {}
+    if brotli is not None:
+        encodings['br'] = brotli.compress(content, quality=11)
+    encodings['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+    return encodings
+
+
+class SchemaDocument:
+    """
+    A rendered schema with its precompressed variants, each with its strong ETag.
+    """
+
+    def __init__(self, content, encodings=None):
+        self.content = content
+        self.encodings = compress(content) if encodings is None else encodings
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etags = {None: quote_etag(digest), **{name: quote_etag(f'{digest}-{name}') for name in self.encodings}}
+
+    def negotiate_encoding(self, request):
+        accepted = {
+            coding.split(';')[0].strip().lower() for coding in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        return next((name for name in self.encodings if name in accepted), None)
+
+    def response(self, request, content_type, headers=None):
+        encoding = self.negotiate_encoding(request)
+        etag = self.etags[encoding]
+        response = conditional_response(request, etag)
+        if response is None:
+            response = HttpResponse(self.encodings[encoding] if encoding else self.content, content_type=content_type)
+            if encoding:
+                response['Content-Encoding'] = encoding
+            for header, value in (headers or {}).items():
+                response[header] = value
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+def document_name(version, lang, schema_format):
+    return f'schema-{version or "default"}-{lang}.{schema_format}'
+
+
+def generate_document(generator_class, version, schema_format, urlconf=None, patterns=None):
+    """
+    The public schema in the active language, as ``drf-spectacular``'s ``spectacular`` command generates it.
+    """
+    generator = generator_class(urlconf=urlconf, api_version=version, patterns=patterns)
+    schema = generator.get_schema(request=None, public=True)
+    renderer = RENDERERS[schema_format]()
+    return SchemaDocument(renderer.render(schema, renderer.media_type, {}))
+
+
+def write_document(directory, name, document):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_bytes(document.content)
+    for encoding, content in document.encodings.items():
+        (directory / f'{name}.{encoding}').write_bytes(content)
+
+
+def read_document(directory, name):
+    path = Path(directory) / name
+    if not path.is_file():
+        return None
+    encodings = {}
+    for encoding in ENCODINGS:
+        encoded_path = path.with_name(f'{name}.{encoding}')
+        if encoded_path.is_file():
+            encodings[encoding] = encoded_path.read_bytes()
+    return SchemaDocument(path.read_bytes(), encodings or None)
+
+
+class SchemaStore:
+    """
+    Schema documents of the process per version, language and format.
+
+    A document missing from memory is read from ``SCHEMA_CACHE_DIR``, where the ``build_schema`` command
+    writes them at deploy time, and otherwise generated once, whichever thread asks for it first.
+    """
+
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def get(self, version, schema_format, generator_class, urlconf=None, patterns=None):
+        name = document_name(version, translation.get_language(), schema_format)
+        document = self._documents.get(name)
+        if document is not None:
+            return document
+
+        with self._lock:
+            document = self._documents.get(name)
+            if document is None:
+                directory = getattr(settings, 'SCHEMA_CACHE_DIR', None)
+                if directory:
+                    document = read_document(directory, name)
+                if document is None:
+                    document = generate_document(generator_class, version, schema_format, urlconf, patterns)
+                self._documents[name] = document
+        return document
+
+    def clear(self):
+        self._documents.clear()
+
+
+schema_store = SchemaStore()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    ``SpectacularAPIView`` serving the public schema generated once per version, language and format, with
+    strong ETags and precompressed bodies.
+    """
+
+    def _get_schema_response(self, request):
+        if not self.serve_public:
+            # The schema then depends on the permissions of the requesting user
+            return super()._get_schema_response(request)
+
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        document = schema_store.get(
+            version, request.accepted_renderer.format, self.generator_class, self.urlconf, self.patterns,
+        )
+        return document.response(request, request.accepted_renderer.media_type, {
+            'Content-Disposition': f'inline; filename="{self._get_filename(request, version)}"',
+        })
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 
+from utils.cache import build_caches
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -29,7 +31,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -48,9 +50,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.InstrumentationMiddleware',
+    'config.middleware.DatabaseRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,7 +62,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
-    'djangorestframework_camel_case.middleware.CamelCaseMiddleWare',
+    'config.middleware.CamelCaseMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -91,6 +95,19 @@ DATABASES = {
     }
 }
 
+# Aliases of DATABASES that reads of GET, HEAD and OPTIONS requests are spread over, see utils.db
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['utils.db.PrimaryReplicaRouter']
+
+# Cache
+# One alias per kind of data so each can get its own backend, see utils.cache.build_caches
+
+CACHES = build_caches('locmem://')
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -149,10 +166,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'djangorestframework_camel_case.parser.CamelCaseFormParser',
         'djangorestframework_camel_case.parser.CamelCaseMultiPartParser',
-        'djangorestframework_camel_case.parser.CamelCaseJSONParser',
+        'utils.camel_case.CamelCaseJSONParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'djangorestframework_camel_case.render.CamelCaseJSONRenderer',
+        'utils.camel_case.CamelCaseJSONRenderer',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
@@ -182,9 +199,58 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'TOKEN_OBTAIN_SERIALIZER': 'apps.accounts.serializers.WithUserTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.UserTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'apps.accounts.serializers.UserTokenBlacklistSerializer',
+}
+
+MAIL_QUEUE = {
+    'BACKEND': 'utils.mail.ThreadMailQueue',
+    'BATCH_SIZE': 20,
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF': 2,
+}
+
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'BUDGETS': {
+        'accounts:password_reset': {'db_queries': 1},
+        'accounts:password_reset_confirm': {'db_queries': 1},
+    },
+    'BUDGET_ACTION': 'log',
 }
 
+ACCOUNTS = {
+    'STATELESS_AUTHENTICATION': False,
+    'USER_CACHE_ENABLED': True,
+    'USER_CACHE_ALIAS': 'users',
+    'USER_CACHE_TIMEOUT': 300,
+    'USER_CACHE_LOCAL_MAXSIZE': 1024,
+    'USER_CACHE_LOCAL_TIMEOUT': 30,
+    'TOKEN_BLACKLIST_ALIAS': 'tokens',
+    'TOKEN_BLACKLIST_OUTSTANDING_TIMEOUT': 60,
+    'THROTTLE_CACHE_ALIAS': 'throttles',
+    'LOGIN_GUARD_ENABLED': True,
+    'LOGIN_FAILURES_PER_ACCOUNT': 5,
+    'LOGIN_FAILURES_PER_IP': 20,
+    'LOGIN_LOCKOUT_BASE': 60,
+    'LOGIN_LOCKOUT_MAX': 3600,
+    'LOGIN_FAILURE_WINDOW': 900,
+    'OUTSTANDING_TOKEN_BATCH_SIZE': 1,
+    'ASYNC_VIEWS': False,
+    'PASSWORD_HASHING_MAX_WORKERS': None,
+    'PASSWORD_HASHING_QUEUE_SIZE': 16,
+    'EXPORT_CHUNK_SIZE': 2000,
+    'IMPORT_MAX_ROWS': 1000,
+    'IMPORT_WORKERS': None,
+}
+
+# Where build_schema writes the documents served at /api/schema/, generated on first request when missing.
+# Only set in production, a directory built once would hide later changes to the API during development
+SCHEMA_CACHE_DIR = None
+
 SPECTACULAR_SETTINGS = {
+    'DEFAULT_GENERATOR_CLASS': 'config.generators.SchemaGenerator',
     'SCHEMA_PATH_PREFIX': r'^/api/',
     'SCHEMA_COERCE_PATH_PK_SUFFIX': True,
     'TITLE': 'API Docs',
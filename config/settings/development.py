@@ -8,9 +8,12 @@ INTERNAL_IPS = [
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# The primary again, which tests mirror, list it in DATABASE_REPLICAS to try the read routing locally
+DATABASES['replica_1'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
 INSTALLED_APPS.append('debug_toolbar')
 
-MIDDLEWARE.insert(1, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+MIDDLEWARE.insert(2, 'debug_toolbar.middleware.DebugToolbarMiddleware')
 
 ALLOWED_HOSTS.append('*')
 
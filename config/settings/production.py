@@ -1,19 +1,49 @@
-import dj_database_url
 from decouple import config
 
 from .base import *
+from utils.cache import CACHE_ALIASES, build_caches
+from utils.db import build_databases
 
 DEBUG = config('DEBUG', default=False, cast=bool)
 
 SECRET_KEY = config('SECRET_KEY')
 
-DATABASES['default'] = dj_database_url.parse(config('DATABASE_URL'), conn_max_age=600, conn_health_checks=True)
+# DATABASE_POOL uses the PostgreSQL connection pool (psycopg[pool]) instead of persistent connections
+DATABASES = build_databases(
+    config('DATABASE_URL'),
+    config('DATABASE_REPLICA_URLS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]),
+    conn_max_age=config('CONN_MAX_AGE', default=600, cast=int),
+    pool={
+        'min_size': config('DATABASE_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+    } if config('DATABASE_POOL', default=False, cast=bool) else None,
+)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
 
-if not DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
-    DATABASES['default']['OPTIONS'] = {
-        'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-        'charset': 'utf8mb4',
-    }
+# CACHE_URL_<ALIAS> gives an alias its own backend, CACHE_TIERED_ALIASES a per-process tier in front of it
+CACHES = build_caches(
+    config('CACHE_URL', default=config('REDIS_URL') if config('REDIS_ENABLED', default=False, cast=bool) else 'locmem://'),
+    {alias: config(f'CACHE_URL_{alias.upper()}', default='') for alias in CACHE_ALIASES},
+    tiered=config('CACHE_TIERED_ALIASES', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]),
+    local_maxsize=config('CACHE_LOCAL_MAXSIZE', default=1024, cast=int),
+    local_timeout=config('CACHE_LOCAL_TIMEOUT', default=30, cast=int),
+)
+
+ACCOUNTS['STATELESS_AUTHENTICATION'] = config('STATELESS_AUTHENTICATION', default=False, cast=bool)
+ACCOUNTS['OUTSTANDING_TOKEN_BATCH_SIZE'] = config('OUTSTANDING_TOKEN_BATCH_SIZE', default=1, cast=int)
+ACCOUNTS['ASYNC_VIEWS'] = config('ASYNC_VIEWS', default=False, cast=bool)
+ACCOUNTS['PASSWORD_HASHING_MAX_WORKERS'] = config('PASSWORD_HASHING_MAX_WORKERS', default=None, cast=lambda v: v and int(v))
+ACCOUNTS['PASSWORD_HASHING_QUEUE_SIZE'] = config('PASSWORD_HASHING_QUEUE_SIZE', default=16, cast=int)
+ACCOUNTS['IMPORT_WORKERS'] = config('IMPORT_WORKERS', default=None, cast=lambda v: v and int(v))
+
+INSTRUMENTATION['ENABLED'] = config('INSTRUMENTATION_ENABLED', default=True, cast=bool)
+# Server-Timing reveals query counts and timings to clients, only enable it behind a trusted proxy
+INSTRUMENTATION['SERVER_TIMING'] = config('SERVER_TIMING', default=False, cast=bool)
+
+SCHEMA_CACHE_DIR = config('SCHEMA_CACHE_DIR', default=str(BASE_DIR / 'schema'))
+
+# Proxies in front of the application, client addresses are only read from X-Forwarded-For when set
+REST_FRAMEWORK['NUM_PROXIES'] = config('NUM_PROXIES', default=None, cast=lambda v: v and int(v))
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=lambda v: [s.strip() for s in v.split(',')])
 
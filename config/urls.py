@@ -16,16 +16,25 @@ Including another URLconf
 """
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib import admin
-from django.urls import path, include, re_path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from django.urls import URLResolver, path, include, re_path
+from django.urls.resolvers import RoutePattern
+
+from config.views import CacheStatsView, MetricsView, lazy_view
 
 urlpatterns = [
-    path('administration/', admin.site.urls),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # The admin URLconf, which runs the admin autodiscovery, is imported when an admin URL is first resolved
+    # (or any URL reversed), unlike include() which imports it along with this module
+    URLResolver(RoutePattern('administration/'), 'config.admin_urls'),
+    # The schema and the docs are only imported when first requested
+    path('api/schema/', lazy_view('config.schema.CachedSpectacularAPIView'), name='schema'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/metrics/caches/', CacheStatsView.as_view(), name='cache_stats'),
     path('api/', include(('apps.accounts.urls', 'accounts'), namespace='accounts')),
-    path('docs/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc-ui'),
-    re_path('^docs(/swagger)?/$', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('docs/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView', url_name='schema'), name='redoc-ui'),
+    re_path(
+        '^docs(/swagger)?/$', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'),
+        name='swagger-ui',
+    ),
 
 ]
 
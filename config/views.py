@@ -0,0 +1,49 @@
+from django.utils.module_loading import import_string
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.cache import cache_stats
+from utils.instrumentation import registry
+
+
+@extend_schema(exclude=True)
+class MetricsView(APIView):
+    """
+    Per URL name latency histograms and metric totals of the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+    # URL names are keys, they must not be camelized
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request):
+        return Response(registry.snapshot())
+
+
+@extend_schema(exclude=True)
+class CacheStatsView(APIView):
+    """
+    Backend of every cache alias and, for tiered ones, the hit counts of the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+def lazy_view(view_path, **initkwargs):
+    """
+    View that imports the class based view at ``view_path`` on its first request, which keeps views seldom
+    used in production, and what they import, out of the boot of every worker.
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+    return dispatch
@@ -0,0 +1,168 @@
+"""
+Warm-up of a worker process, so that its first requests don't pay for what Django and DRF build lazily.
+
+``config.wsgi`` and ``config.asgi`` call ``warm_up(connect=False)`` when ``WARM_UP`` is set, which runs
+once in the master of a server preloading the application (``gunicorn --preload``) and is inherited by
+every forked worker. Connections must not be shared by forked processes, open them and send the
+synthetic requests from a post-fork hook instead, e.g. in ``gunicorn.conf.py``::
+
+    def post_worker_init(worker):
+        from config.warmup import warm_up
+        warm_up(requests=True)
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import caches
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# URL namespaces the synthetic requests are sent to, for each of their routes without arguments
+NAMESPACES = ('accounts',)
+
+# URLconfs imported on demand (see config.urls), which warming the resolvers must not import
+LAZY_URLCONFS = ('config.admin_urls',)
+
+WARMUP_CACHE_KEY = 'warm-up'
+
+
+def route_path(prefix, pattern):
+    """
+    Path of a ``path()`` route without arguments under ``prefix``, None for the other patterns.
+    """
+    if prefix is None or not isinstance(pattern.pattern, RoutePattern) or pattern.pattern.converters:
+        return None
+    return prefix + str(pattern.pattern)
+
+
+def warm_resolvers(resolver=None, namespace=None, prefix='/'):
+    """
+    Compiles the pattern of every URL and fills the reverse lookups of the namespaces, returns
+    ``(view, url_name, path)`` of each URL, with ``url_name`` prefixed by its namespaces and ``path`` None
+    when the URL takes arguments.
+
+    The URLconfs of ``LAZY_URLCONFS`` are left alone, and so are the reverse lookups of the root URLconf,
+    whose population imports every URLconf it includes: the first ``reverse()`` of a worker still pays it.
+    """
+    resolver = resolver or get_resolver()
+    if resolver.namespace:
+        resolver.reverse_dict
+    views = []
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        path = route_path(prefix, pattern)
+        if isinstance(pattern, URLResolver):
+            if pattern.urlconf_name in LAZY_URLCONFS:
+                continue
+            views += warm_resolvers(pattern, ':'.join(filter(None, (namespace, pattern.namespace))) or None, path)
+        else:
+            name = pattern.name and ':'.join(filter(None, (namespace, pattern.name)))
+            views.append((pattern.callback, name, path))
+    return views
+
+
+def warm_serializers(views):
+    """
+    Builds the fields of the ``serializer_class`` of each view, and the field plans of those that have one.
+    """
+    serializer_classes = {getattr(getattr(view, 'cls', None), 'serializer_class', None) for view, *_ in views}
+    for serializer_class in filter(None, serializer_classes):
+        if hasattr(serializer_class, 'get_field_plan'):
+            serializer_class.get_field_plan()
+        serializer_class().fields
+
+
+def warm_templates():
+    from apps.accounts.serializers import password_reset_email
+
+    with translation.override(settings.LANGUAGE_CODE):
+        password_reset_email.render(verification_code='')
+
+
+def warm_hashers():
+    # Hashers relying on a third party library (argon2, bcrypt) import it on their first use, the ones after
+    # the default only verify older hashes and may not have it installed
+    hasher = hashers.get_hasher('default')
+    if getattr(hasher, 'library', None):
+        hasher._load_library()
+
+
+def warm_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    for alias in settings.CACHES:
+        caches[alias].get(WARMUP_CACHE_KEY)
+
+
+def get_host():
+    host = next((host for host in settings.ALLOWED_HOSTS if '*' not in host), 'localhost')
+    return host.lstrip('.')
+
+
+def send_requests(views, namespaces=NAMESPACES):
+    """
+    Sends an OPTIONS request to each route of ``namespaces`` that takes no argument, through the whole
+    middleware stack. OPTIONS goes through authentication, permissions and the serializers without changing
+    anything, anonymous requests are answered with 401 or 403 on protected routes. Views with throttles are
+    skipped, their counters are shared with the clients of the same address.
+    """
+    handler = WSGIHandler()
+    factory = RequestFactory(HTTP_HOST=get_host())
+    request_logger = logging.getLogger('django.request')
+    disabled, request_logger.disabled = request_logger.disabled, True
+    paths = {
+        path for view, name, path in views
+        if path and name and name.partition(':')[0] in namespaces
+        and not getattr(getattr(view, 'cls', None), 'throttle_classes', None)
+    }
+    try:
+        for path in sorted(paths):
+            handler.get_response(factory.options(path, secure=True))
+    finally:
+        request_logger.disabled = disabled
+
+
+def warm_up(connect=True, requests=False):
+    """
+    Primes the URL resolvers, the serializers of the views, the templates and the password hashers, and
+    when ``connect`` the database and cache connections. ``requests`` also sends synthetic requests to
+    the routes of ``NAMESPACES``, which connects as well.
+
+    Returns the duration of each step in milliseconds.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    def step(name):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = (now - started) * 1000
+        started = now
+
+    views = warm_resolvers()
+    step('urls')
+    warm_serializers(views)
+    step('serializers')
+    warm_templates()
+    step('templates')
+    warm_hashers()
+    step('hashers')
+    if connect or requests:
+        warm_connections()
+        step('connections')
+        if requests:
+            send_requests(views)
+            step('requests')
+
+    logger.info('Warm-up done in %.1f ms (%s)', sum(timings.values()), ', '.join(
+        f'{name} {duration:.1f} ms' for name, duration in timings.items()
+    ))
+    return timings
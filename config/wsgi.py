@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from decouple import config
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Run once before the workers are forked by servers preloading the application, see config.warmup
+if config('WARM_UP', default=False, cast=bool):
+    from config.warmup import warm_up
+
+    warm_up(connect=False)
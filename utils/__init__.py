@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 import html2text
 
 
+@lru_cache(maxsize=256)
 def htmltotext(html: str):
     parser = html2text.HTML2Text()
     parser.strong_mark = ''
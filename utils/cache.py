@@ -0,0 +1,310 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Caches the project reads from besides "default", see CACHES in config/settings/base.py
+CACHE_ALIASES = ('sessions', 'throttles', 'tokens', 'users')
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Bounded, thread-safe, per-process LRU cache whose entries expire after ``timeout`` seconds.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def parse_cache_url(url, name='default'):
+    """
+    ``CACHES`` entry for a cache URL, in the spirit of ``dj_database_url.parse``:
+
+    ``locmem://``, ``file:///var/cache/app``, ``db://cache_table``, ``redis://host:6379/0``,
+    ``memcached://host:11211`` or ``dummy://``. Query parameters become ``OPTIONS``, except ``timeout``
+    and ``key_prefix``. ``name`` tells the locmem stores and file directories of each alias apart.
+    """
+    parts = urlsplit(url)
+    try:
+        config = {'BACKEND': BACKENDS[parts.scheme]}
+    except KeyError:
+        raise ValueError(f'Unsupported cache URL scheme: {parts.scheme!r}')
+
+    options = dict(parse_qsl(parts.query))
+    if 'timeout' in options:
+        config['TIMEOUT'] = int(options.pop('timeout'))
+    if 'key_prefix' in options:
+        config['KEY_PREFIX'] = options.pop('key_prefix')
+
+    if parts.scheme == 'locmem':
+        config['LOCATION'] = parts.netloc or name
+    elif parts.scheme == 'file':
+        config['LOCATION'] = f'{parts.path.rstrip("/")}/{name}'
+    elif parts.scheme == 'db':
+        config['LOCATION'] = parts.netloc or parts.path.strip('/')
+    elif parts.scheme in ('redis', 'rediss'):
+        config['LOCATION'] = parts._replace(query='').geturl()
+    elif parts.scheme == 'memcached':
+        config['LOCATION'] = parts.netloc
+    if options:
+        config['OPTIONS'] = options
+    return config
+
+
+def build_caches(default_url, urls=None, tiered=(), local_maxsize=1024, local_timeout=30):
+    """
+    ``CACHES`` with the "default" alias and one per ``CACHE_ALIASES``, each from its own URL in ``urls`` or
+    ``default_url``. Aliases sharing a backend get their name as key prefix so they cannot collide.
+
+    Aliases listed in ``tiered`` become a ``TieredCache`` in front of their backend, which stays reachable
+    under ``<alias>_shared``.
+    """
+    urls = urls or {}
+    caches = {}
+    for alias in ('default', *CACHE_ALIASES):
+        config = parse_cache_url(urls.get(alias) or default_url, name=alias)
+        config.setdefault('KEY_PREFIX', '' if alias == 'default' else alias)
+        if alias in tiered:
+            caches[f'{alias}_shared'] = config
+            config = {
+                'BACKEND': 'utils.cache.TieredCache',
+                'LOCATION': alias,
+                'OPTIONS': {
+                    'SHARED': f'{alias}_shared',
+                    'LOCAL_MAXSIZE': local_maxsize,
+                    'LOCAL_TIMEOUT': local_timeout,
+                },
+            }
+        caches[alias] = config
+    return caches
+
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache backend: a per-process ``LocalLRUCache`` in front of the cache alias named by the
+    ``SHARED`` option, which every write goes through.
+
+    Local entries live at most ``LOCAL_TIMEOUT`` seconds, that is how long another process may still
+    see a value after it was changed or deleted, so only put data that tolerates it behind this tier.
+    ``get_or_set`` only computes a missing value once per process and, through a lock key added to the
+    shared tier, once across processes while others wait up to ``LOCK_TIMEOUT`` seconds for it.
+
+    Instances built for the same ``LOCATION`` share their local tier and their ``stats``.
+    """
+    _locals = {}
+    _stats = defaultdict(lambda: defaultdict(int))
+    _registry_lock = threading.Lock()
+    _key_locks = [threading.Lock() for _ in range(64)]
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.name = location or options['SHARED']
+        self.shared_alias = options['SHARED']
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        with self._registry_lock:
+            if self.name not in self._locals:
+                self._locals[self.name] = LocalLRUCache(
+                    maxsize=options.get('LOCAL_MAXSIZE', 1024), timeout=options.get('LOCAL_TIMEOUT', 30),
+                )
+        self.local = self._locals[self.name]
+        self.stats = self._stats[self.name]
+
+    @property
+    def shared(self):
+        from django.core.cache import caches
+
+        return caches[self.shared_alias]
+
+    def _local_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return None
+        return max(timeout - time.time(), 0)
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self.local.get(local_key, _MISSING)
+        if value is not _MISSING:
+            self.stats['local_hits'] += 1
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.stats['misses'] += 1
+            return default
+        self.stats['shared_hits'] += 1
+        self.local.set(local_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        self.stats['sets'] += 1
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(self.make_and_validate_key(key, version=version), value, self._local_timeout(timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self.stats['sets'] += 1
+        self.local.set(self.make_and_validate_key(key, version=version), value, self._local_timeout(timeout))
+        return True
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+
+        local_key = self.make_and_validate_key(key, version=version)
+        with self._key_locks[hash(local_key) % len(self._key_locks)]:
+            # Another thread of this process may have computed it meanwhile
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+
+            lock_key = f'{key}:lock'
+            locked = self.shared.add(lock_key, True, self.lock_timeout, version=version)
+            if not locked:
+                self.stats['stampede_waits'] += 1
+                deadline = time.monotonic() + self.lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    value = self.get(key, _MISSING, version=version)
+                    if value is not _MISSING:
+                        return value
+            try:
+                value = default() if callable(default) else default
+                self.set(key, value, timeout, version=version)
+            finally:
+                # Computed anyway once the wait timed out, the lock may then belong to another process
+                if locked:
+                    self.shared.delete(lock_key, version=version)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.stats['deletes'] += 1
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(self.make_and_validate_key(key, version=version), _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        self.stats['local_hits'] += len(found)
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            self.stats['shared_hits'] += len(shared)
+            self.stats['misses'] += len(missing) - len(shared)
+            for key, value in shared.items():
+                self.local.set(self.make_and_validate_key(key, version=version), value)
+            found.update(shared)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete(key, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+def shared_backend(cache):
+    """
+    The backend behind the local tier of a ``TieredCache``, ``cache`` itself otherwise.
+    """
+    return cache.shared if isinstance(cache, TieredCache) else cache
+
+
+def cache_stats():
+    """
+    Backend of every configured alias, with the hit, miss and write counts of the process for tiered ones.
+    """
+    stats = {}
+    for alias, config in settings.CACHES.items():
+        stats[alias] = {'backend': config['BACKEND']}
+        name = config.get('LOCATION') or config.get('OPTIONS', {}).get('SHARED')
+        if config['BACKEND'] == 'utils.cache.TieredCache' and name in TieredCache._locals:
+            counts = dict(TieredCache._stats[name])
+            lookups = counts.get('local_hits', 0) + counts.get('shared_hits', 0) + counts.get('misses', 0)
+            stats[alias].update(counts)
+            stats[alias]['hit_ratio'] = (lookups - counts.get('misses', 0)) / lookups if lookups else 0.0
+            stats[alias]['local_size'] = len(TieredCache._locals[name])
+    return stats
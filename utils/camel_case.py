@@ -0,0 +1,189 @@
+import datetime
+import json
+import math
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case import util
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Values orjson encodes natively exactly like the stdlib encoder, or hands to ``default`` through OPT_PASSTHROUGH_DATETIME
+PASSTHROUGH_TYPES = (datetime.datetime, datetime.date, datetime.time, datetime.timedelta, uuid.UUID)
+
+
+class _Fallback(Exception):
+    """
+    Raised while converting data orjson would not handle exactly like the json module.
+    """
+
+
+@lru_cache(maxsize=1024)
+def _camelize_keys(keys):
+    """
+    Camelized ``keys`` of a dict, cached per key set since serializers emit the same fields for every object.
+
+    Returns None when a key is not a plain string (lazy translations, numbers), those are not cached.
+    """
+    if not all(type(key) is str for key in keys):
+        return None
+    return tuple(util.camelize_re.sub(util.underscore_to_camel, key) if '_' in key else key for key in keys)
+
+
+@lru_cache(maxsize=4096)
+def _underscore_key(key, no_underscore_before_number):
+    return util.camel_to_underscore(key, no_underscore_before_number=no_underscore_before_number)
+
+
+def _check_float(value):
+    # repr() switches to exponent notation outside this range, which orjson formats differently
+    if not math.isfinite(value) or (value and not 1e-4 <= abs(value) < 1e16):
+        raise _Fallback
+
+
+def _camelize(data, strict):
+    data_type = type(data)
+    if data_type is str or data_type is bool or data is None:
+        return data
+    if data_type is int:
+        if strict and not -2 ** 63 <= data < 2 ** 64:
+            raise _Fallback
+        return data
+    if data_type is float:
+        if strict:
+            _check_float(data)
+        return data
+    if isinstance(data, Promise):
+        return force_str(data)
+    if isinstance(data, dict):
+        new_keys = _camelize_keys(tuple(data))
+        if new_keys is None:
+            if strict:
+                raise _Fallback
+            return util.camelize(data)
+        return dict(zip(new_keys, [_camelize(value, strict) for value in data.values()]))
+    if isinstance(data, (list, tuple)):
+        return [_camelize(item, strict) for item in data]
+    if isinstance(data, (str, int, float)):
+        if strict:
+            raise _Fallback
+        return data
+    if util.is_iterable(data):
+        return [_camelize(item, strict) for item in data]
+    if strict and not isinstance(data, PASSTHROUGH_TYPES):
+        raise _Fallback
+    return data
+
+
+def camelize(data):
+    """
+    ``djangorestframework_camel_case.util.camelize`` with the key conversion cached per dict key set.
+    """
+    options = camel_case_settings.JSON_UNDERSCOREIZE
+    if options.get('ignore_fields') or options.get('ignore_keys'):
+        return util.camelize(data, **options)
+    return _camelize(data, strict=False)
+
+
+def underscoreize(data):
+    """
+    ``djangorestframework_camel_case.util.underscoreize`` with the key conversion cached, for plain dicts and
+    lists. Query dicts and the ``ignore_*`` options go through the original implementation.
+    """
+    options = camel_case_settings.JSON_UNDERSCOREIZE
+    if options.get('ignore_fields') or options.get('ignore_keys'):
+        return util.underscoreize(data, **options)
+    return _underscoreize(data, bool(options.get('no_underscore_before_number')))
+
+
+def _underscoreize(data, no_underscore_before_number, strict=False):
+    data_type = type(data)
+    if data_type is dict:
+        return {
+            _underscore_key(key, no_underscore_before_number) if type(key) is str else key:
+                _underscoreize(value, no_underscore_before_number, strict)
+            for key, value in data.items()
+        }
+    if data_type is list:
+        return [_underscoreize(item, no_underscore_before_number, strict) for item in data]
+    if data_type is float:
+        # orjson decodes integers beyond 64 bits as floats where json.loads keeps them exact
+        if strict and not abs(data) < 2 ** 63:
+            raise _Fallback
+        return data
+    if data_type in (str, int, bool) or data is None:
+        return data
+    return util.underscoreize(data, **camel_case_settings.JSON_UNDERSCOREIZE)
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    """
+    Drop-in ``djangorestframework_camel_case.render.CamelCaseJSONRenderer`` producing the same bytes.
+
+    Compact output is encoded with orjson when it is installed, unless the data holds something orjson would
+    write differently (exponent floats, big integers, non string keys, types left to the encoder's default),
+    in which case the whole document goes through ``json.dumps`` as before.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = camel_case_settings.JSON_UNDERSCOREIZE
+        fast = (
+            orjson is not None and self.compact and not self.ensure_ascii and self.strict
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+            and not options.get('ignore_fields') and not options.get('ignore_keys')
+        )
+        if fast:
+            try:
+                content = orjson.dumps(
+                    _camelize(data, strict=True),
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME,
+                )
+            except (_Fallback, TypeError):
+                pass
+            else:
+                return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+        return super().render(camelize(data), accepted_media_type, renderer_context)
+
+
+class CamelCaseJSONParser(JSONParser):
+    """
+    Drop-in ``djangorestframework_camel_case.parser.CamelCaseJSONParser`` decoding with orjson when it is installed.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read().decode(encoding)
+            return self.loads(content)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+    @staticmethod
+    def loads(content):
+        options = camel_case_settings.JSON_UNDERSCOREIZE
+        if orjson is not None and not options.get('ignore_fields') and not options.get('ignore_keys'):
+            try:
+                return _underscoreize(
+                    orjson.loads(content), bool(options.get('no_underscore_before_number')), strict=True
+                )
+            except (orjson.JSONDecodeError, _Fallback):
+                # The stdlib accepts more (NaN, big integers) and its error messages are part of the API
+                pass
+        return underscoreize(json.loads(content))
@@ -0,0 +1,78 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Responses carrying validators must be revalidated on each use and only kept by the client's own cache
+CACHE_CONTROL = {'private': True, 'no_cache': True}
+
+
+def make_etag(*parts):
+    """
+    Strong ETag identifying ``parts``, e.g. the values a representation is built from and its format.
+    """
+    return quote_etag(hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest())
+
+
+def conditional_response(request, etag=None, last_modified=None):
+    """
+    The 304 Not Modified (or 412 Precondition Failed) to answer ``request`` with according to its
+    ``If-None-Match``/``If-Modified-Since`` headers, None when the full response must be sent.
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag=None, last_modified=None, cache_control=CACHE_CONTROL):
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+    if etag or last_modified:
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for ``APIView`` subclasses: ``get_etag`` and ``get_last_modified`` are evaluated once
+    authentication, permissions and throttles passed, and a client whose copy is still current gets a
+    304 Not Modified before the handler runs, so nothing is queried or serialized for it.
+
+    Both return None by default, override at least one with something cheaper than building the response,
+    e.g. from objects authentication already loaded or from a version stamp kept in the cache.
+    """
+    conditional_methods = ('GET', 'HEAD')
+    cache_control = CACHE_CONTROL
+
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method in self.conditional_methods:
+            self.validators = {'etag': self.get_etag(request), 'last_modified': self.get_last_modified(request)}
+            response = conditional_response(request, **self.validators)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'validators', None) and response.status_code in (200, 304):
+            set_validators(response, **self.validators, cache_control=self.cache_control)
+        return response
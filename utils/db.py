@@ -0,0 +1,107 @@
+import contextvars
+import random
+from contextlib import contextmanager
+
+import dj_database_url
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Requests with any other method are pinned to the primary from their start, so that what they read
+# before writing is never behind the primary
+READ_ONLY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# Routing state of the request being served: {'pinned': bool, 'replica': alias or None}, None outside requests
+current_routing = contextvars.ContextVar('database_routing', default=None)
+
+
+def parse_database_url(url, conn_max_age=600, pool=None):
+    """
+    ``DATABASES`` entry for ``url``. ``pool`` enables the connection pool of the PostgreSQL backend, either
+    True or the ``psycopg_pool.ConnectionPool`` arguments (``min_size``, ``max_size``, ``timeout``...),
+    other engines keep persistent connections.
+    """
+    config = dj_database_url.parse(url, conn_max_age=conn_max_age, conn_health_checks=True)
+    if config['ENGINE'] == 'django.db.backends.mysql':
+        config['OPTIONS'] = {
+            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+            'charset': 'utf8mb4',
+        }
+    elif config['ENGINE'] == 'django.db.backends.postgresql' and pool:
+        # Pooled connections are returned to the pool after each request, they cannot also be persistent
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS'] = {'pool': pool}
+    return config
+
+
+def build_databases(primary_url, replica_urls=(), conn_max_age=600, pool=None):
+    """
+    ``DATABASES`` with the primary as "default" and each of ``replica_urls`` as "replica_<n>". Replicas
+    mirror the primary in tests, list them in ``DATABASE_REPLICAS`` to route reads to them.
+    """
+    databases = {DEFAULT_DB_ALIAS: parse_database_url(primary_url, conn_max_age, pool)}
+    for index, url in enumerate(replica_urls, start=1):
+        config = parse_database_url(url, conn_max_age, pool)
+        config['TEST'] = {'MIRROR': DEFAULT_DB_ALIAS}
+        databases[f'replica_{index}'] = config
+    return databases
+
+
+def start_routing(request):
+    """
+    Starts routing the queries of ``request``, returns the token to pass to ``stop_routing``.
+    """
+    return current_routing.set({'pinned': request.method not in READ_ONLY_METHODS, 'replica': None})
+
+
+def stop_routing(token):
+    current_routing.reset(token)
+
+
+def pin_primary():
+    """
+    Sends every following query of the current request to the primary.
+    """
+    routing = current_routing.get()
+    if routing is not None:
+        routing['pinned'] = True
+
+
+@contextmanager
+def use_primary():
+    """
+    Reads from the primary within the block, e.g. right after a write made by another request.
+    """
+    token = current_routing.set(None)
+    try:
+        yield
+    finally:
+        current_routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends the reads of safe requests (``READ_ONLY_METHODS``) to one of ``DATABASE_REPLICAS``, picked once
+    per request so that all its reads see the same replica. The first write pins the rest of the request
+    to the primary, as do transactions and other request methods.
+
+    Queries made outside a request (management commands, shells, tasks) always use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if routing is None or routing['pinned'] or not replicas:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if routing['replica'] is None:
+            routing['replica'] = random.choice(replicas)
+        return routing['replica']
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
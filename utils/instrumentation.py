@@ -0,0 +1,297 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Add a Server-Timing header with the db, cache, serializer and total durations
+    'SERVER_TIMING': True,
+    # Ceilings per URL name, e.g. {'accounts:token_refresh': {'db_queries': 8, 'total_ms': 150}}, checked against
+    # db_queries, db_ms, cache_calls, cache_ms, serializer_ms and total_ms
+    'BUDGETS': {},
+    # 'log' a warning or 'raise' BudgetExceeded, which fails the request and so the test that made it
+    'BUDGET_ACTION': 'log',
+    'HISTOGRAM_BUCKETS_MS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+}
+
+CACHE_METHODS = frozenset({
+    'add', 'get', 'set', 'touch', 'delete', 'get_many', 'get_or_set', 'has_key', 'incr', 'decr', 'set_many',
+    'delete_many', 'clear',
+})
+
+
+def instrumentation_setting(name):
+    return getattr(settings, 'INSTRUMENTATION', {}).get(name, DEFAULTS[name])
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'total', 'db_queries', 'db_time', 'cache_calls', 'cache_time', 'serializer_time',
+                 'active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_calls = 0
+        self.cache_time = 0.0
+        self.serializer_time = 0.0
+        # Names of the timers running, nested serializers are only timed once
+        self.active = set()
+
+    def stop(self):
+        self.total = time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'db_queries': self.db_queries,
+            'db_ms': self.db_time * 1000,
+            'cache_calls': self.cache_calls,
+            'cache_ms': self.cache_time * 1000,
+            'serializer_ms': self.serializer_time * 1000,
+            'total_ms': self.total * 1000,
+        }
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.2f};desc="{self.cache_calls} calls"',
+            f'serializer;dur={self.serializer_time * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ))
+
+
+current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+@contextmanager
+def timer(name):
+    """
+    Adds the time spent in the block to the ``<name>_time`` of the request being instrumented, if any.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+
+    metrics.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active.discard(name)
+        setattr(metrics, f'{name}_time', getattr(metrics, f'{name}_time') + time.perf_counter() - started)
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def _install_execute_wrapper(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class InstrumentedCache:
+    """
+    Proxy counting and timing the calls made to a cache backend, and their ``a``-prefixed async variants.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self.cache, name)
+
+        if name in CACHE_METHODS:
+            @wraps(attr)
+            def instrumented(*args, **kwargs):
+                with self._timer():
+                    return attr(*args, **kwargs)
+        elif name.startswith('a') and name[1:] in CACHE_METHODS:
+            @wraps(attr)
+            async def instrumented(*args, **kwargs):
+                with self._timer():
+                    return await attr(*args, **kwargs)
+        else:
+            return attr
+        return instrumented
+
+    @staticmethod
+    def _timer():
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.cache_calls += 1
+        return timer('cache')
+
+
+def instrument_cache(cache):
+    return InstrumentedCache(cache) if instrumentation_setting('ENABLED') else cache
+
+
+def _instrument_serializers():
+    from rest_framework.serializers import BaseSerializer
+
+    if getattr(BaseSerializer, '_instrumented', False):
+        return
+
+    is_valid = BaseSerializer.is_valid
+    data = BaseSerializer.data.fget
+
+    @wraps(is_valid)
+    def timed_is_valid(self, *args, **kwargs):
+        with timer('serializer'):
+            return is_valid(self, *args, **kwargs)
+
+    @wraps(data)
+    def timed_data(self):
+        with timer('serializer'):
+            return data(self)
+
+    BaseSerializer.is_valid = timed_is_valid
+    BaseSerializer.data = property(timed_data)
+    BaseSerializer._instrumented = True
+
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def install():
+    """
+    Hooks query counting into database connections as they are created and timing into DRF serializers.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        connection_created.connect(_install_execute_wrapper, dispatch_uid='utils.instrumentation')
+        _instrument_serializers()
+        _installed = True
+
+
+def start():
+    """
+    Starts instrumenting the current request, returns its metrics and the token to pass to ``stop``.
+    """
+    # Connections opened before install() (or by another thread) never sent connection_created
+    for connection in connections.all(initialized_only=True):
+        _install_execute_wrapper(None, connection)
+    metrics = RequestMetrics()
+    return metrics, current_metrics.set(metrics)
+
+
+def stop(token):
+    current_metrics.reset(token)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):
+        return {
+            'buckets': {**{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                        '+Inf': self.counts[-1]},
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class MetricsRegistry:
+    """
+    Per-process aggregates by URL name: a latency histogram and the totals of every other metric.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name, metrics):
+        values = metrics.as_dict()
+        with self._lock:
+            try:
+                view = self._views[view_name]
+            except KeyError:
+                view = self._views[view_name] = {
+                    'latency_ms': Histogram(instrumentation_setting('HISTOGRAM_BUCKETS_MS')),
+                    'totals': dict.fromkeys(values, 0),
+                }
+            view['latency_ms'].observe(values['total_ms'])
+            for name, value in values.items():
+                view['totals'][name] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view_name: {'latency_ms': view['latency_ms'].as_dict(), 'totals': dict(view['totals'])}
+                for view_name, view in self._views.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+def check_budget(view_name, metrics):
+    budget = instrumentation_setting('BUDGETS').get(view_name)
+    if not budget:
+        return
+
+    values = metrics.as_dict()
+    exceeded = {name: (values[name], limit) for name, limit in budget.items() if values[name] > limit}
+    if not exceeded:
+        return
+
+    message = f'{view_name} exceeded its budget: ' + ', '.join(
+        f'{name}={value:g} > {limit:g}' for name, (value, limit) in exceeded.items()
+    )
+    if instrumentation_setting('BUDGET_ACTION') == 'raise':
+        raise BudgetExceeded(message)
+    logger.warning(message)
+
+
+def finish(request, response, metrics):
+    metrics.stop()
+    match = getattr(request, 'resolver_match', None)
+    view_name = match.view_name if match is not None and match.view_name else '<unresolved>'
+
+    registry.observe(view_name, metrics)
+    if instrumentation_setting('SERVER_TIMING'):
+        response['Server-Timing'] = metrics.server_timing()
+    check_budget(view_name, metrics)
+    return response
@@ -0,0 +1,210 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+from django.utils.translation import get_language
+
+from utils import htmltotext
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'utils.mail.ThreadMailQueue',
+    # Messages sent over a single SMTP connection
+    'BATCH_SIZE': 20,
+    # Seconds the worker waits for more messages before sending a partial batch
+    'BATCH_WAIT': 0.05,
+    'MAX_QUEUE_SIZE': 1000,
+    'MAX_RETRIES': 3,
+    # Retry n waits RETRY_BACKOFF * 2 ** n seconds
+    'RETRY_BACKOFF': 2,
+}
+
+
+def mail_queue_setting(name):
+    return getattr(settings, 'MAIL_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+class BaseMailQueue:
+    """
+    Dispatches ``EmailMessage`` instances on behalf of request handlers.
+
+    Subclasses decide when ``send_batch`` runs, it opens one connection for the whole batch and
+    hands failed messages to ``retry``.
+    """
+
+    def enqueue(self, message):
+        raise NotImplementedError
+
+    def flush(self, timeout=None):
+        return True
+
+    def send_batch(self, batch):
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            for message, attempt in batch:
+                self.retry(message, attempt, exc)
+            return
+
+        try:
+            for message, attempt in batch:
+                message.connection = connection
+                try:
+                    message.send()
+                except Exception as exc:
+                    self.retry(message, attempt, exc)
+                else:
+                    self.done(message)
+        finally:
+            connection.close()
+
+    def retry(self, message, attempt, exc):
+        logger.warning('Sending mail to %s failed (attempt %s): %s', message.to, attempt + 1, exc)
+        self.done(message)
+
+    def done(self, message):
+        pass
+
+
+class ImmediateMailQueue(BaseMailQueue):
+    """
+    Sends on the calling thread, exceptions propagate to the caller.
+    """
+
+    def enqueue(self, message):
+        message.send()
+
+
+class ThreadMailQueue(BaseMailQueue):
+    """
+    In-process queue drained by a daemon worker thread, started lazily in each (forked) process.
+
+    When the queue is full the message is sent on the calling thread rather than dropped.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=mail_queue_setting('MAX_QUEUE_SIZE'))
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._worker = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        if self._worker is None or self._pid != os.getpid() or not self._worker.is_alive():
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+            self._worker.start()
+
+    def enqueue(self, message, attempt=0):
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((message, attempt))
+        except queue.Full:
+            logger.warning('Mail queue is full, sending to %s synchronously', message.to)
+            self.send_batch([(message, attempt)])
+            return
+        self._ensure_worker()
+
+    def _run(self):
+        batch_size = mail_queue_setting('BATCH_SIZE')
+        batch_wait = mail_queue_setting('BATCH_WAIT')
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < batch_size:
+                    batch.append(self._queue.get(timeout=batch_wait))
+            except queue.Empty:
+                pass
+            try:
+                self.send_batch(batch)
+            except Exception:
+                logger.exception('Mail queue worker failed to send a batch')
+                for message, _ in batch:
+                    self.done(message)
+
+    def retry(self, message, attempt, exc):
+        if attempt + 1 >= mail_queue_setting('MAX_RETRIES'):
+            logger.error('Giving up sending mail to %s after %s attempts: %s', message.to, attempt + 1, exc)
+            self.done(message)
+            return
+
+        delay = mail_queue_setting('RETRY_BACKOFF') * 2 ** attempt
+        logger.warning('Sending mail to %s failed, retrying in %ss: %s', message.to, delay, exc)
+        timer = threading.Timer(delay, self._requeue, args=(message, attempt + 1))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue(self, message, attempt):
+        self.enqueue(message, attempt)
+        self.done(message)
+
+    def done(self, message):
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every queued message was sent or given up on, returns False on timeout.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending <= 0, timeout)
+
+
+class EmailTemplate:
+    """
+    Renders an HTML email template and its text conversion once per language.
+
+    ``placeholders`` maps each context variable to the width of its values. They are rendered as
+    markers of that width (so the text conversion wraps lines the same way) and substituted on every
+    ``render`` call, which means their values must not need HTML escaping.
+    """
+
+    def __init__(self, template_name, placeholders):
+        self.template_name = template_name
+        # Private use characters never occur in templates nor get escaped by the text conversion
+        self.markers = {name: chr(0xE000 + index) * width for index, (name, width) in enumerate(placeholders.items())}
+        self._variants = {}
+
+    def _get_variants(self):
+        language = get_language()
+        try:
+            return self._variants[language]
+        except KeyError:
+            html = render_to_string(self.template_name, self.markers)
+            variants = self._variants[language] = (html, htmltotext(html))
+            return variants
+
+    def render(self, **values):
+        """
+        Returns the ``(html, text)`` bodies with the placeholders replaced by ``values``.
+        """
+        html, text = self._get_variants()
+        for name, marker in self.markers.items():
+            value = str(values[name])
+            html = html.replace(marker, value)
+            text = text.replace(marker, value)
+        return html, text
+
+
+@lru_cache(maxsize=None)
+def get_mail_queue():
+    return import_string(mail_queue_setting('BACKEND'))()
+
+
+def _flush_on_exit():
+    if get_mail_queue.cache_info().currsize:
+        get_mail_queue().flush(timeout=10)
+
+
+atexit.register(_flush_on_exit)
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation is a plain conversion, the others are called through the field itself
+CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+    serializers.EmailField: str,
+}
+
+
+def build_field_plan(serializer):
+    """
+    ``(field_name, source, field)`` of each readable field of a model ``serializer``, or None when one of
+    them is not read straight from a concrete, non relational column.
+    """
+    attnames = {field.attname for field in serializer.Meta.model._meta.concrete_fields if not field.is_relation}
+    plan = []
+    for field in serializer._readable_fields:
+        if field.source not in attnames:
+            return None
+        plan.append((field.field_name, field.source, field))
+    return tuple(plan)
+
+
+def iso_datetime(field, tz):
+    """
+    ``DateTimeField.to_representation`` in ISO 8601 for the aware datetimes of the time zone ``tz``.
+    """
+    def convert(value):
+        if value.__class__ is not datetime or value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def get_converter(field, tz):
+    convert = CONVERTERS.get(type(field))
+    if convert is not None:
+        return convert
+    if (type(field) is serializers.DateTimeField and tz is not None and not hasattr(field, 'timezone')
+            and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601):
+        return iso_datetime(field, tz)
+    return field.to_representation
+
+
+class FieldPlanMixin:
+    """
+    Read fast path for a ``ModelSerializer`` whose readable fields only map model columns.
+
+    The fields are built once per class, instead of once per serializer instance, and ``to_representation``
+    reads and converts each column directly, from model instances or from ``.values(*cls.value_fields())``
+    rows. Set ``Meta.list_serializer_class`` to ``FieldPlanListSerializer`` so that ``many=True`` resolves the
+    conversions once per list. The output is the one of ``ModelSerializer``, which is still used when the
+    plan does not apply, so the readable fields must not depend on the serializer's context.
+    """
+
+    @classmethod
+    def get_field_plan(cls):
+        # Looked up on the class itself so that subclasses get their own plan
+        try:
+            return cls.__dict__['_field_plan']
+        except KeyError:
+            cls._field_plan = build_field_plan(cls())
+            return cls._field_plan
+
+    @classmethod
+    def value_fields(cls):
+        """
+        Names to pass to ``QuerySet.values`` for rows ``to_representation`` accepts, None without a plan.
+        """
+        plan = cls.get_field_plan()
+        return None if plan is None else [source for _name, source, _field in plan]
+
+    @classmethod
+    def get_converters(cls):
+        """
+        ``(field_name, source, convert)`` of the field plan, for the time zone currently active.
+        """
+        plan = cls.get_field_plan()
+        if plan is None:
+            return None
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return [(name, source, get_converter(field, tz)) for name, source, field in plan]
+
+    def to_representation(self, instance, converters=None):
+        converters = converters or self.get_converters()
+        if converters is None:
+            return super().to_representation(instance)
+
+        ret = {}
+        if isinstance(instance, dict):
+            for name, source, convert in converters:
+                value = instance[source]
+                ret[name] = None if value is None else convert(value)
+            return ret
+
+        try:
+            for name, source, convert in converters:
+                value = getattr(instance, source)
+                ret[name] = None if value is None else convert(value)
+        except AttributeError:
+            # ModelSerializer skips the missing attributes of read-only fields
+            return super().to_representation(instance)
+        return ret
+
+
+class FieldPlanListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        converters = self.child.get_converters()
+        if converters is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return [self.child.to_representation(item, converters) for item in iterable]